@@ -29,6 +29,7 @@ rsync -avz --delete \
     --exclude 'debug_page.txt' \
     --exclude 'monitor.log' \
     --exclude 'dashboard.html' \
+    --exclude 'dashboard.css' \
     --exclude 'prices.csv' \
     --exclude '.git/' \
     --exclude '.DS_Store' \
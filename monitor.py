@@ -16,65 +16,120 @@ Usage:
 
 import sys
 import time
+import logging
 import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 from travel_monitor.config import load_config
-from travel_monitor.storage import log_results, migrate_old_csv
+from travel_monitor.storage import (
+    log_results, migrate_old_csv, changed_fingerprint, save_fingerprint,
+)
 from travel_monitor.alerts import (
     check_flight_alerts, check_train_alerts,
-    build_summary_email, send_email,
+    build_summary_email, send_emails, flush_macos_notifications,
+    is_email_active,
 )
 from travel_monitor.dashboard import generate_dashboard
-from travel_monitor.scrapers.flight_scraper import scrape_flight_route
-from travel_monitor.scrapers.train_scraper import scrape_train_route
+from travel_monitor.scrapers.flight_scraper import scrape_flight_routes
+from travel_monitor.scrapers.train_scraper import scrape_train_routes
+
+log = logging.getLogger("travel_monitor")
 
 
 def run_check(config, route_filter=None, flights_only=False, trains_only=False,
               geo_spoof=True):
     """Run a single check cycle for all configured routes."""
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"\n{'='*60}")
-    print(f"  {config.company} Travel Monitor")
-    print(f"  {now}")
-    print(f"  Routes: {len(config.flights)} flights, {len(config.trains)} trains")
-    print(f"  Geo-spoofing: {'ON' if geo_spoof else 'OFF'}")
-    print(f"{'='*60}")
+    log.info("=" * 60)
+    log.info("  %s Travel Monitor", config.company)
+    log.info("  %s", now)
+    log.info("  Routes: %d flights, %d trains", len(config.flights), len(config.trains))
+    log.info("  Geo-spoofing: %s", "ON" if geo_spoof else "OFF")
+    log.info("=" * 60)
 
     flight_results = {}
     train_results = {}
-
-    # --- Flights ---
-    if not trains_only:
-        for route in config.flights:
-            if route_filter and route.id != route_filter:
-                continue
-            results = scrape_flight_route(route, geo_spoof=geo_spoof)
-            flight_results[route.id] = results
-            log_results(results)
-            check_flight_alerts(results, route, config)
-
-    # --- Trains ---
-    if not flights_only:
-        for route in config.trains:
-            if route_filter and route.id != route_filter:
-                continue
-            results = scrape_train_route(route)
-            train_results[route.id] = results
-            log_results(results)
-            check_train_alerts(results, route, config)
-
-    # Dashboard
+    pending_emails = []
+
+    # Flights and trains are scraped concurrently (network-bound); CSV writes
+    # and alerts stay on the main thread as results come in. All routes of a
+    # transport share one browser, so each transport is a single job.
+    flight_routes = [] if trains_only else [
+        r for r in config.flights if not route_filter or r.id == route_filter
+    ]
+    train_routes = [] if flights_only else [
+        r for r in config.trains if not route_filter or r.id == route_filter
+    ]
+    n_jobs = bool(flight_routes) + bool(train_routes)
+
+    if n_jobs:
+        with ThreadPoolExecutor(max_workers=n_jobs) as ex:
+            futs = {}
+            if flight_routes:
+                futs[ex.submit(scrape_flight_routes, flight_routes, geo_spoof=geo_spoof)] = "flights"
+            if train_routes:
+                futs[ex.submit(scrape_train_routes, train_routes)] = "trains"
+
+            for fut in as_completed(futs):
+                kind = futs[fut]
+                try:
+                    results = fut.result()
+                except Exception as e:
+                    log.error("  Error scraping %s: %s", kind, e)
+                    continue
+                if kind == "flights":
+                    for route in flight_routes:
+                        route_results = results.get(route.id)
+                        if route_results is None:
+                            continue
+                        flight_results[route.id] = route_results
+                        pending_emails += check_flight_alerts(route_results, route, config)
+                    # One append per CSV for the whole transport; cache hits
+                    # were logged when first scraped
+                    log_results([r for rs in flight_results.values() for r in rs if not r.cached])
+                else:
+                    for route in train_routes:
+                        route_results = results.get(route.id)
+                        if route_results is None:
+                            continue
+                        train_results[route.id] = route_results
+                        pending_emails += check_train_alerts(route_results, route, config)
+                    log_results([r for rs in train_results.values() for r in rs if not r.cached])
+
+        # Keep config order for the summary email
+        flight_results = {r.id: flight_results[r.id] for r in flight_routes if r.id in flight_results}
+        train_results = {r.id: train_results[r.id] for r in train_routes if r.id in train_results}
+
+    # The dashboard is rebuilt every check: the CSV history just grew
     generate_dashboard(config)
 
-    # Summary email (only if we have data)
-    if flight_results or train_results:
-        summary = build_summary_email(config, flight_results, train_results)
-        send_email(config,
-            f"[{config.company}] Travel Monitor — {datetime.now().strftime('%d/%m %H:%M')}",
-            summary)
+    # Summary only when prices changed since the previous check of the same
+    # scope (a --route/--flights/--trains run is its own scope)
+    scope = "-".join(filter(None, (route_filter,
+                                   "flights" if flights_only else "",
+                                   "trains" if trains_only else "")))
+    all_results = [r for rs in (*flight_results.values(), *train_results.values()) for r in rs]
+    digest = changed_fingerprint(all_results, scope)
+    summary_queued = False
+    if digest:
+        # Summary email (only if we have data), sent with the alerts in one SMTP session
+        if (flight_results or train_results) and is_email_active(config):
+            summary = build_summary_email(config, flight_results, train_results)
+            pending_emails.append((
+                f"[{config.company}] Travel Monitor — {datetime.now().strftime('%d/%m %H:%M')}",
+                summary,
+            ))
+            summary_queued = True
+    else:
+        log.info("  No price changes since last check: summary skipped")
+    sent = send_emails(config, pending_emails)
+    # Only a fully handled change is recorded; otherwise the next run retries
+    if digest and (not summary_queued or sent == len(pending_emails)):
+        save_fingerprint(digest, scope)
+    flush_macos_notifications()
 
-    print(f"\n  Check complete at {datetime.now().strftime('%H:%M:%S')}")
+    log.info("  Check complete at %s", datetime.now().strftime('%H:%M:%S'))
 
 
 def main():
@@ -86,8 +141,14 @@ def main():
     ap.add_argument("--daemon", action="store_true", help="Continuous mode")
     ap.add_argument("--no-geo", action="store_true", help="Disable geo-spoofing")
     ap.add_argument("--migrate", action="store_true", help="Migrate old prices.csv")
+    ap.add_argument("--quiet", action="store_true", help="Only log warnings and errors")
     args = ap.parse_args()
 
+    logging.basicConfig(
+        level=logging.WARNING if args.quiet else logging.INFO,
+        format="%(asctime)s %(message)s",
+    )
+
     config = load_config()
 
     if args.migrate:
@@ -104,16 +165,23 @@ def main():
 
     if args.daemon:
         hrs = config.check_interval_hours
-        print(f"  Daemon: every {hrs}h (Ctrl+C to stop)\n")
-        while True:
-            try:
+        log.info("  Daemon: every %sh (Ctrl+C to stop)", hrs)
+        # Fixed cadence on the monotonic clock: check duration does not add drift
+        deadline = time.monotonic()
+        try:
+            while True:
                 run_check(config, args.route, args.flights, args.trains,
                           geo_spoof=not args.no_geo)
-                print(f"\n  Next in {hrs}h...")
-                time.sleep(hrs * 3600)
-            except KeyboardInterrupt:
-                print("\n  Stopped.")
-                break
+                # Pick up config.json edits between cycles (cached while unchanged)
+                config = load_config()
+                hrs = config.check_interval_hours
+                # Skip missed ticks instead of running them back-to-back
+                deadline = max(deadline + hrs * 3600, time.monotonic())
+                sleep_for = deadline - time.monotonic()
+                log.info("  Next in %.1fh...", sleep_for / 3600)
+                time.sleep(max(0, sleep_for))
+        except KeyboardInterrupt:
+            log.info("  Stopped.")
     else:
         run_check(config, args.route, args.flights, args.trains,
                   geo_spoof=not args.no_geo)
@@ -0,0 +1,64 @@
+"""TTL cache for scrape results, persisted with shelve under data/."""
+
+import shelve
+import threading
+import time
+
+from .storage import DATA_DIR
+
+CACHE_FILE = DATA_DIR / "scrape_cache"
+
+# No caller reads entries older than this (the longest TTL, Renfe station
+# picks at 30 days): they are dropped instead of kept forever
+MAX_TTL = 30 * 86400
+# Expired entries are swept on the first open of a run, then at most this often
+PRUNE_INTERVAL = 6 * 3600
+
+# Routes are scraped from worker threads; shelve is not thread-safe
+_lock = threading.Lock()
+_pruned_at = None
+
+
+def _open():
+    """Open the shelve (caller holds _lock), sweeping expired entries when due."""
+    global _pruned_at
+    DATA_DIR.mkdir(exist_ok=True)
+    db = shelve.open(str(CACHE_FILE))
+    now = time.time()
+    if _pruned_at is None or now - _pruned_at > PRUNE_INTERVAL:
+        _pruned_at = now
+        try:
+            _prune(db, now)
+        except BaseException:
+            db.close()
+            raise
+    return db
+
+
+def _prune(db, now: float):
+    stale = [key for key, (stored_at, _) in db.items() if now - stored_at > MAX_TTL]
+    for key in stale:
+        del db[key]
+    # gdbm keeps freed space in the file until reorganized
+    if stale and hasattr(db.dict, "reorganize"):
+        db.dict.reorganize()
+
+
+def cache_get(key: str, ttl: float):
+    """Return the cached value for key if younger than ttl seconds, else None."""
+    with _lock:
+        with _open() as db:
+            entry = db.get(key)
+    if entry is None:
+        return None
+    stored_at, value = entry
+    if time.time() - stored_at > ttl:
+        return None
+    return value
+
+
+def cache_set(key: str, value):
+    """Store a picklable value under key with the current time."""
+    with _lock:
+        with _open() as db:
+            db[key] = (time.time(), value)
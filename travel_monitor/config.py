@@ -1,15 +1,18 @@
 """Configuration loading and dataclasses for multi-route travel monitoring."""
 
-import json
+import functools
+import os
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional
 
+from .utils import json_loads
+
 
 SCRIPT_DIR = Path(__file__).parent.parent
 
 
-@dataclass
+@dataclass(slots=True)
 class FlightRoute:
     id: str
     origin: str
@@ -26,7 +29,7 @@ class FlightRoute:
     adults: int = 1
 
 
-@dataclass
+@dataclass(slots=True)
 class TrainRoute:
     id: str
     origin_name: str
@@ -38,7 +41,7 @@ class TrainRoute:
     weeks: int = 12
 
 
-@dataclass
+@dataclass(slots=True)
 class EmailConfig:
     enabled: bool = True
     recipients: list = field(default_factory=list)
@@ -49,7 +52,7 @@ class EmailConfig:
     smtp_password: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class Config:
     company: str = "Redegal"
     currency: str = "EUR"
@@ -60,10 +63,20 @@ class Config:
 
 
 def load_config(path: Optional[Path] = None) -> Config:
-    """Load config from JSON file and return typed Config object."""
+    """Load config from JSON file and return typed Config object.
+
+    The parsed Config is reused until the file's mtime or size changes, so
+    callers (e.g. the daemon loop) can reload it every cycle cheaply.
+    """
     config_path = path or (SCRIPT_DIR / "config.json")
-    with open(config_path) as f:
-        raw = json.load(f)
+    st = os.stat(config_path)
+    return _load_config(str(config_path), st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_config(config_path: str, mtime_ns: int, size: int) -> Config:
+    with open(config_path, "rb") as f:
+        raw = json_loads(f.read())
 
     email_raw = raw.get("email", {})
     # Support both old "to" (string) and new "recipients" (list)
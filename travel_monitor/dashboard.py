@@ -1,282 +1,216 @@
-"""Interactive HTML dashboard generator with tabs for Flights/Trains."""
+"""Interactive HTML dashboard generator with tabs for Flights/Trains.
 
-import json
+History rows come from storage.read_history with "price" already a
+float (or None).
+"""
+
+import logging
+import math
+import shutil
 from datetime import datetime
+from heapq import nlargest
+from html import escape
+from operator import itemgetter
+from string import Template
 from pathlib import Path
 
 from .config import Config
 from .storage import read_history
-from .utils import build_google_url
+from .utils import build_google_url, json_dumps
 
 SCRIPT_DIR = Path(__file__).parent.parent
 DASHBOARD_FILE = SCRIPT_DIR / "dashboard.html"
+CSS_FILE_NAME = "dashboard.css"
 OUTPUT_DIR = SCRIPT_DIR / "output"
 
+log = logging.getLogger(__name__)
 
-def generate_dashboard(config: Config):
-    """Generate interactive HTML dashboard with Flights/Trains tabs."""
+HISTORY_ROWS = 100  # rows shown in each route's history table
+CHART_POINTS = 500  # most recent observations plotted per cabin
 
-    # Gather all flight data
-    flight_data = {}
-    for route in config.flights:
-        rows = read_history("flight", route.id)
-        flight_data[route.id] = {
-            "route": route,
-            "rows": rows,
-        }
 
-    # Gather all train data
-    train_data = {}
-    for route in config.trains:
-        rows = read_history("train", route.id)
-        train_data[route.id] = {
-            "route": route,
-            "rows": rows,
-        }
+def _recent_history(by_cabin: dict, labels: dict, thresholds: dict, extra: str) -> list:
+    """Newest HISTORY_ROWS [ts, cabin label, price, extra, ok] rows across cabins.
 
-    # Build JSON data for injection
-    flight_json = {}
-    for rid, d in flight_data.items():
-        route = d["route"]
-        rows = d["rows"]
-        by_cabin = {}
-        for cabin in ["ECONOMY", "BUSINESS"]:
-            cabin_rows = [r for r in rows if r.get("cabin_class") == cabin]
-            by_cabin[cabin] = {
-                "timestamps": [r["timestamp"][:16].replace("T", " ") for r in cabin_rows],
-                "prices": [float(r["price"]) if r.get("price") else None for r in cabin_rows],
-                "weeks": [r.get("week_start", "") for r in cabin_rows],
-            }
-
-        # Best prices per week
-        week_best = {}
-        for r in rows:
-            if not r.get("price"):
-                continue
-            ws = r.get("week_start", "")
-            cabin = r.get("cabin_class", "")
-            key = f"{ws}_{cabin}"
-            price = float(r["price"])
-            if key not in week_best or price < week_best[key]["price"]:
-                week_best[key] = {"price": price, "week": ws, "cabin": cabin}
+    ok is true when the price is at or under the cabin's alert threshold.
+    Timestamps are ISO-formatted, so plain string order is time order.
+    """
+    rows = (
+        (ts, cabin, price, x)
+        for cabin, series in by_cabin.items()
+        for ts, price, x in zip(series["timestamps"], series["prices"], series[extra])
+    )
+    return [
+        [ts, labels[cabin], price, x, price is not None and price <= thresholds[cabin]]
+        for ts, cabin, price, x in nlargest(HISTORY_ROWS, rows, key=itemgetter(0))
+    ]
 
-        flight_json[rid] = {
-            "label": f"{route.origin_name} → {route.destination_name}",
-            "origin": route.origin,
-            "destination": route.destination,
-            "by_cabin": by_cabin,
-            "week_best": list(week_best.values()),
-            "alerts": route.alerts,
-            "google_url": build_google_url(route.origin, route.destination, "", "", "economy"),
+
+def _chart_series(by_cabin: dict) -> dict:
+    """Per-cabin chart data: the last CHART_POINTS timestamps and prices."""
+    return {
+        cabin: {
+            "timestamps": series["timestamps"][-CHART_POINTS:],
+            "prices": series["prices"][-CHART_POINTS:],
         }
+        for cabin, series in by_cabin.items()
+    }
 
-    train_json = {}
-    for rid, d in train_data.items():
-        route = d["route"]
-        rows = d["rows"]
-        by_cabin = {}
-        for cabin in ["TURISTA", "PREFERENTE"]:
-            cabin_rows = [r for r in rows if r.get("cabin_class") == cabin]
-            by_cabin[cabin] = {
-                "timestamps": [r["timestamp"][:16].replace("T", " ") for r in cabin_rows],
-                "prices": [float(r["price"]) if r.get("price") else None for r in cabin_rows],
-                "dates": [r.get("travel_date", "") for r in cabin_rows],
-            }
 
-        week_best = {}
-        for r in rows:
-            if not r.get("price"):
-                continue
-            td = r.get("travel_date", "")
-            cabin = r.get("cabin_class", "")
-            key = f"{td}_{cabin}"
-            price = float(r["price"])
-            if key not in week_best or price < week_best[key]["price"]:
-                week_best[key] = {"price": price, "date": td, "cabin": cabin}
+def _best_by_cabin(week_best: dict, cabins) -> dict:
+    """Lowest price per cabin (None if never priced), from the per-week minima."""
+    best = dict.fromkeys(cabins)
+    for (_, cabin), price in week_best.items():
+        if cabin in best and (best[cabin] is None or price < best[cabin]):
+            best[cabin] = price
+    return best
 
-        train_json[rid] = {
-            "label": f"{route.origin_name} → {route.destination_name}",
-            "by_cabin": by_cabin,
-            "week_best": list(week_best.values()),
-            "alerts": route.alerts,
-        }
 
-    flight_routes_json = json.dumps(flight_json, ensure_ascii=False)
-    train_routes_json = json.dumps(train_json, ensure_ascii=False)
-    flight_ids = json.dumps(list(flight_json.keys()))
-    train_ids = json.dumps(list(train_json.keys()))
-    company = config.company
-    now_str = datetime.now().strftime('%d/%m/%Y %H:%M')
-    interval = config.check_interval_hours
+def _script_json(obj) -> str:
+    """JSON safe to embed in a <script>: '<' is escaped so no value can close the tag."""
+    return json_dumps(obj).replace("<", "\\u003c")
+
+
+def _write_if_changed(path: Path, text: str):
+    """Write text to path unless it already has exactly that content."""
+    try:
+        if path.read_text() == text:
+            return
+    except FileNotFoundError:
+        pass
+    path.write_text(text)
+
+
+def _route_data_blocks(prefix: str, payloads: dict) -> str:
+    """One <script type="application/json" id="{prefix}-{rid}"> block per route."""
+    return "\n".join(
+        f'<script type="application/json" id="{prefix}-{escape(rid)}">{_script_json(data)}</script>'
+        for rid, data in payloads.items()
+    )
 
-    html = f"""<!DOCTYPE html>
-<html lang="es"><head>
-<meta charset="UTF-8"><meta name="viewport" content="width=device-width,initial-scale=1">
-<title>{company} — Travel Monitor</title>
-<script src="https://cdn.jsdelivr.net/npm/chart.js@4"></script>
-<style>
-*{{margin:0;padding:0;box-sizing:border-box}}
-body{{font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',Roboto,sans-serif;background:#0f172a;color:#e2e8f0;padding:16px}}
-.w{{max-width:1200px;margin:0 auto}}
-.hd{{text-align:center;margin-bottom:20px}}
-h1{{font-size:1.8em;background:linear-gradient(135deg,#3b82f6,#a855f7);-webkit-background-clip:text;-webkit-text-fill-color:transparent;display:inline}}
-.co{{font-size:.8em;color:#64748b;background:#1e293b;padding:2px 8px;border-radius:6px;margin-left:8px}}
-.sub{{color:#94a3b8;font-size:.9em;margin-top:4px}}
+
+# Stylesheet written next to both dashboard outputs (browser-cacheable)
+_DASHBOARD_CSS = """*{margin:0;padding:0;box-sizing:border-box}
+body{font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',Roboto,sans-serif;background:#0f172a;color:#e2e8f0;padding:16px}
+.w{max-width:1200px;margin:0 auto}
+.hd{text-align:center;margin-bottom:20px}
+h1{font-size:1.8em;background:linear-gradient(135deg,#3b82f6,#a855f7);-webkit-background-clip:text;-webkit-text-fill-color:transparent;display:inline}
+.co{font-size:.8em;color:#64748b;background:#1e293b;padding:2px 8px;border-radius:6px;margin-left:8px}
+.sub{color:#94a3b8;font-size:.9em;margin-top:4px}
 
 /* Tabs */
-.tabs{{display:flex;gap:4px;margin-bottom:16px;border-bottom:2px solid #334155;padding-bottom:0}}
-.tab{{padding:10px 24px;cursor:pointer;border-radius:8px 8px 0 0;font-weight:600;font-size:.9em;transition:all .2s;border:1px solid transparent;border-bottom:none}}
-.tab:hover{{background:#1e293b}}
-.tab.active{{background:#1e293b;color:#60a5fa;border-color:#334155}}
-.tab-flight.active{{color:#3b82f6}}
-.tab-train.active{{color:#a855f7}}
-.tab-content{{display:none}}.tab-content.active{{display:block}}
+.tabs{display:flex;gap:4px;margin-bottom:16px;border-bottom:2px solid #334155;padding-bottom:0}
+.tab{padding:10px 24px;cursor:pointer;border-radius:8px 8px 0 0;font-weight:600;font-size:.9em;transition:all .2s;border:1px solid transparent;border-bottom:none}
+.tab:hover{background:#1e293b}
+.tab.active{background:#1e293b;color:#60a5fa;border-color:#334155}
+.tab-flight.active{color:#3b82f6}
+.tab-train.active{color:#a855f7}
+.tab-content{display:none}.tab-content.active{display:block}
 
 /* Route selector */
-.route-sel{{margin-bottom:16px;display:flex;align-items:center;gap:12px;flex-wrap:wrap}}
-.route-sel label{{color:#94a3b8;font-size:.85em}}
-.route-sel select{{background:#1e293b;color:#e2e8f0;border:1px solid #334155;border-radius:8px;padding:8px 16px;font-size:.9em;cursor:pointer}}
-.route-sel select:focus{{outline:none;border-color:#3b82f6}}
+.route-sel{margin-bottom:16px;display:flex;align-items:center;gap:12px;flex-wrap:wrap}
+.route-sel label{color:#94a3b8;font-size:.85em}
+.route-sel select{background:#1e293b;color:#e2e8f0;border:1px solid #334155;border-radius:8px;padding:8px 16px;font-size:.9em;cursor:pointer}
+.route-sel select:focus{outline:none;border-color:#3b82f6}
 
 /* Cards */
-.best{{display:grid;grid-template-columns:1fr 1fr;gap:14px;margin:16px 0}}
-.best-card{{background:#1e293b;border-radius:14px;padding:20px;border:1px solid #334155;text-align:center}}
-.best-card.hit{{border-color:#4ade80;box-shadow:0 0 20px rgba(74,222,128,.15)}}
-.best-label{{font-size:.8em;color:#94a3b8;margin-bottom:4px}}
-.best-price{{font-size:2.2em;font-weight:800}}.best-price.g{{color:#4ade80}}.best-price.r{{color:#f87171}}.best-price.p{{color:#c084fc}}
-.best-info{{font-size:.82em;color:#94a3b8;margin-top:6px}}
-.best-action{{margin-top:10px}}
-.best-action a{{display:inline-block;padding:8px 20px;border-radius:8px;font-weight:700;font-size:.85em;text-decoration:none}}
-.btn-buy{{background:#16a34a;color:#fff}}.btn-wait{{background:#334155;color:#94a3b8}}
+.best{display:grid;grid-template-columns:1fr 1fr;gap:14px;margin:16px 0}
+.best-card{background:#1e293b;border-radius:14px;padding:20px;border:1px solid #334155;text-align:center}
+.best-card.hit{border-color:#4ade80;box-shadow:0 0 20px rgba(74,222,128,.15)}
+.best-label{font-size:.8em;color:#94a3b8;margin-bottom:4px}
+.best-price{font-size:2.2em;font-weight:800}.best-price.g{color:#4ade80}.best-price.r{color:#f87171}.best-price.p{color:#c084fc}
+.best-info{font-size:.82em;color:#94a3b8;margin-top:6px}
+.best-action{margin-top:10px}
+.best-action a{display:inline-block;padding:8px 20px;border-radius:8px;font-weight:700;font-size:.85em;text-decoration:none}
+.btn-buy{background:#16a34a;color:#fff}.btn-wait{background:#334155;color:#94a3b8}
 
 /* Charts */
-.chs{{display:grid;grid-template-columns:1fr 1fr;gap:14px;margin-bottom:16px}}
-@media(max-width:700px){{.chs,.best{{grid-template-columns:1fr}}}}
-.ch{{background:#1e293b;border-radius:12px;padding:14px;border:1px solid #334155}}
-.ch h3{{font-size:.85em;color:#94a3b8;margin-bottom:8px}}
+.chs{display:grid;grid-template-columns:1fr 1fr;gap:14px;margin-bottom:16px}
+@media(max-width:700px){.chs,.best{grid-template-columns:1fr}}
+.ch{background:#1e293b;border-radius:12px;padding:14px;border:1px solid #334155}
+.ch h3{font-size:.85em;color:#94a3b8;margin-bottom:8px}
 
 /* Week grid */
-.week-grid{{display:grid;grid-template-columns:repeat(auto-fill,minmax(80px,1fr));gap:6px;margin:16px 0}}
-.week-cell{{background:#1e293b;border-radius:8px;padding:8px 6px;text-align:center;border:1px solid #334155;font-size:.78em}}
-.week-cell .wk{{color:#64748b;font-size:.72em}}.week-cell .wp{{font-weight:700;font-size:1.1em}}
-.week-cell.cheap{{border-color:#4ade80;background:#064e3b}}.week-cell.mid{{border-color:#fbbf24;background:#78350f}}.week-cell.exp{{border-color:#f87171;background:#7f1d1d}}
+.week-grid{display:grid;grid-template-columns:repeat(auto-fill,minmax(80px,1fr));gap:6px;margin:16px 0}
+.week-cell{background:#1e293b;border-radius:8px;padding:8px 6px;text-align:center;border:1px solid #334155;font-size:.78em}
+.week-cell .wk{color:#64748b;font-size:.72em}.week-cell .wp{font-weight:700;font-size:1.1em}
+.week-cell.cheap{border-color:#4ade80;background:#064e3b}.week-cell.mid{border-color:#fbbf24;background:#78350f}.week-cell.exp{border-color:#f87171;background:#7f1d1d}
 
 /* Links */
-.links{{text-align:center;margin:14px 0}}.links a{{color:#60a5fa;margin:0 10px;font-size:.85em}}
+.links{text-align:center;margin:14px 0}.links a{color:#60a5fa;margin:0 10px;font-size:.85em}
 
 /* Table */
-table{{width:100%;border-collapse:collapse;background:#1e293b;border-radius:12px;overflow:hidden;border:1px solid #334155;margin-bottom:14px}}
-th{{background:#334155;padding:8px 10px;text-align:left;font-size:.75em;color:#94a3b8}}
-td{{padding:7px 10px;border-bottom:1px solid #293548;font-size:.82em}}
-tr:hover td{{background:#263548}}
-.bg{{display:inline-block;padding:2px 7px;border-radius:8px;font-size:.72em;font-weight:600}}
-.bg-g{{background:#064e3b;color:#4ade80}}.bg-r{{background:#7f1d1d;color:#f87171}}.bg-y{{background:#78350f;color:#fbbf24}}.bg-p{{background:#3b0764;color:#c084fc}}
-.ft{{text-align:center;color:#475569;font-size:.72em;margin-top:14px}}
-</style></head><body>
-<div class="w">
-<div class="hd"><h1>Travel Monitor</h1><span class="co">{company}</span>
-<p class="sub">Vuelos + Trenes &middot; Multiruta &middot; Cada {interval}h</p></div>
-
-<div class="tabs">
-<div class="tab tab-flight active" onclick="switchTab('flights')">Vuelos</div>
-<div class="tab tab-train" onclick="switchTab('trains')">Trenes</div>
-</div>
-
-<!-- FLIGHTS TAB -->
-<div id="tab-flights" class="tab-content active">
-<div class="route-sel">
-<label>Ruta:</label>
-<select id="flight-route-select" onchange="renderFlightRoute(this.value)"></select>
-</div>
-<div id="flight-best" class="best"></div>
-<div class="links" id="flight-links"></div>
-<div id="flight-charts" class="chs">
-<div class="ch"><h3 id="fc1-title">Turista</h3><canvas id="fc1"></canvas></div>
-<div class="ch"><h3 id="fc2-title">Business</h3><canvas id="fc2"></canvas></div>
-</div>
-<h3 style="color:#94a3b8;font-size:.85em;margin-bottom:8px">Precios por semana (Turista)</h3>
-<div id="flight-week-grid" class="week-grid"></div>
-<h3 style="color:#94a3b8;font-size:.85em;margin:12px 0 8px">Historial</h3>
-<table><thead><tr><th>Fecha</th><th>Semana</th><th>Clase</th><th>Precio</th><th>Escalas</th><th>Duracion</th></tr></thead>
-<tbody id="flight-tbody"></tbody></table>
-</div>
-
-<!-- TRAINS TAB -->
-<div id="tab-trains" class="tab-content">
-<div class="route-sel">
-<label>Ruta:</label>
-<select id="train-route-select" onchange="renderTrainRoute(this.value)"></select>
-</div>
-<div id="train-best" class="best"></div>
-<div class="links" id="train-links"><a href="https://www.renfe.com/es/es" target="_blank">Renfe</a></div>
-<div id="train-charts" class="chs">
-<div class="ch"><h3 id="tc1-title">Turista</h3><canvas id="tc1"></canvas></div>
-<div class="ch"><h3 id="tc2-title">Preferente</h3><canvas id="tc2"></canvas></div>
-</div>
-<h3 style="color:#94a3b8;font-size:.85em;margin-bottom:8px">Precios por fecha (Turista)</h3>
-<div id="train-week-grid" class="week-grid"></div>
-<h3 style="color:#94a3b8;font-size:.85em;margin:12px 0 8px">Historial</h3>
-<table><thead><tr><th>Fecha</th><th>Viaje</th><th>Clase</th><th>Precio</th><th>Tren</th><th>Horario</th></tr></thead>
-<tbody id="train-tbody"></tbody></table>
-</div>
-
-<p class="ft">{company} Travel Monitor &middot; {now_str} &middot; Cada {interval}h</p>
-</div>
-<script>
-const FD={flight_routes_json};
-const TD={train_routes_json};
-const FIDS={flight_ids};
-const TIDS={train_ids};
-
-let fCharts=[null,null],tCharts=[null,null];
-
-function switchTab(tab){{
+table{width:100%;border-collapse:collapse;background:#1e293b;border-radius:12px;overflow:hidden;border:1px solid #334155;margin-bottom:14px}
+th{background:#334155;padding:8px 10px;text-align:left;font-size:.75em;color:#94a3b8}
+td{padding:7px 10px;border-bottom:1px solid #293548;font-size:.82em}
+tr:hover td{background:#263548}
+.bg{display:inline-block;padding:2px 7px;border-radius:8px;font-size:.72em;font-weight:600}
+.bg-g{background:#064e3b;color:#4ade80}.bg-r{background:#7f1d1d;color:#f87171}.bg-y{background:#78350f;color:#fbbf24}.bg-p{background:#3b0764;color:#c084fc}
+.ft{text-align:center;color:#475569;font-size:.72em;margin-top:14px}
+"""
+
+
+# Page logic, injected as-is (substituted values are not re-scanned for $)
+_DASHBOARD_JS = """let fCharts=[null,null],tCharts=[null,null];
+
+// Route payloads live in <script type="application/json"> blocks and are
+// parsed on first view, so load time does not grow with every route's history.
+const routeCache={};
+function routeData(kind,rid){
+  const key=kind+'-'+rid;
+  if(!(key in routeCache)){
+    const el=document.getElementById(key);
+    routeCache[key]=el?JSON.parse(el.textContent):null;
+  }
+  return routeCache[key];
+}
+
+function switchTab(tab){
   document.querySelectorAll('.tab-content').forEach(e=>e.classList.remove('active'));
   document.querySelectorAll('.tab').forEach(e=>e.classList.remove('active'));
   document.getElementById('tab-'+tab).classList.add('active');
   document.querySelector('.tab-'+(tab==='flights'?'flight':'train')).classList.add('active');
-}}
+}
 
 // --- Flights ---
-function populateFlightSelect(){{
+function populateFlightSelect(){
   const sel=document.getElementById('flight-route-select');
   sel.innerHTML='';
-  FIDS.forEach(id=>{{
+  FIDS.forEach(id=>{
     const opt=document.createElement('option');
-    opt.value=id;opt.textContent=id+' — '+FD[id].label;
+    opt.value=id;opt.textContent=id+' — '+FD[id];
     sel.appendChild(opt);
-  }});
+  });
   if(FIDS.length)renderFlightRoute(FIDS[0]);
-}}
+}
 
-function renderFlightRoute(rid){{
-  const d=FD[rid];if(!d)return;
-  const eco=d.by_cabin.ECONOMY||{{timestamps:[],prices:[]}};
-  const biz=d.by_cabin.BUSINESS||{{timestamps:[],prices:[]}};
+function renderFlightRoute(rid){
+  const d=routeData('fd',rid);if(!d)return;
+  const eco=d.by_cabin.ECONOMY||{timestamps:[],prices:[]};
+  const biz=d.by_cabin.BUSINESS||{timestamps:[],prices:[]};
   const et=d.alerts.economy_max||800,bt=d.alerts.business_max||2200;
 
   // Best cards
-  const ev=eco.prices.filter(p=>p!==null),bv=biz.prices.filter(p=>p!==null);
-  const ebest=ev.length?Math.min(...ev):null,bbest=bv.length?Math.min(...bv):null;
+  const ebest=d.best.ECONOMY,bbest=d.best.BUSINESS;
   const eHit=ebest!==null&&ebest<=et,bHit=bbest!==null&&bbest<=bt;
   document.getElementById('flight-best').innerHTML=`
-  <div class="best-card ${{eHit?'hit':''}}">
+  <div class="best-card ${eHit?'hit':''}">
     <div class="best-label">Mejor Turista</div>
-    <div class="best-price ${{eHit?'g':'r'}}">${{ebest!==null?ebest.toFixed(0)+'\\u20ac':'\\u2014'}}</div>
-    <div class="best-info">Umbral: ${{et}}\\u20ac</div>
-    <div class="best-action"><a class="${{eHit?'btn-buy':'btn-wait'}}" href="${{d.google_url||'#'}}" target="_blank">${{eHit?'COMPRAR':'Esperar'}}</a></div>
+    <div class="best-price ${eHit?'g':'r'}">${ebest!==null?ebest.toFixed(0)+'\\u20ac':'\\u2014'}</div>
+    <div class="best-info">Umbral: ${et}\\u20ac</div>
+    <div class="best-action"><a class="${eHit?'btn-buy':'btn-wait'}" href="${d.google_url||'#'}" target="_blank">${eHit?'COMPRAR':'Esperar'}</a></div>
   </div>
-  <div class="best-card ${{bHit?'hit':''}}">
+  <div class="best-card ${bHit?'hit':''}">
     <div class="best-label">Mejor Business</div>
-    <div class="best-price ${{bHit?'g':'p'}}">${{bbest!==null?bbest.toFixed(0)+'\\u20ac':'\\u2014'}}</div>
-    <div class="best-info">Umbral: ${{bt}}\\u20ac</div>
-    <div class="best-action"><a class="${{bHit?'btn-buy':'btn-wait'}}" href="${{d.google_url||'#'}}" target="_blank">${{bHit?'COMPRAR':'Esperar'}}</a></div>
+    <div class="best-price ${bHit?'g':'p'}">${bbest!==null?bbest.toFixed(0)+'\\u20ac':'\\u2014'}</div>
+    <div class="best-info">Umbral: ${bt}\\u20ac</div>
+    <div class="best-action"><a class="${bHit?'btn-buy':'btn-wait'}" href="${d.google_url||'#'}" target="_blank">${bHit?'COMPRAR':'Esperar'}</a></div>
   </div>`;
 
   // Links
   document.getElementById('flight-links').innerHTML=`
-  <a href="${{d.google_url||'#'}}" target="_blank">Google Flights</a>
-  <a href="https://www.kayak.es/flights/${{d.origin}}-${{d.destination}}/?sort=price_a" target="_blank">Kayak</a>
+  <a href="${d.google_url||'#'}" target="_blank">Google Flights</a>
+  <a href="https://www.kayak.es/flights/${d.origin}-${d.destination}/?sort=price_a" target="_blank">Kayak</a>
   <a href="https://www.skyscanner.es" target="_blank">Skyscanner</a>`;
 
   // Charts
@@ -287,72 +221,67 @@ function renderFlightRoute(rid){{
   fCharts[1]=mkChart('fc2',biz.timestamps,biz.prices,bt,'#a855f7');
 
   // Week grid (economy best per week)
-  const weekBest={{}};
-  (d.week_best||[]).filter(w=>w.cabin==='ECONOMY').forEach(w=>{{
+  const weekBest={};
+  (d.week_best||[]).filter(w=>w.cabin==='ECONOMY').forEach(w=>{
     if(!weekBest[w.week]||w.price<weekBest[w.week])weekBest[w.week]=w.price;
-  }});
+  });
   const weeks=Object.keys(weekBest).sort();
   const wPrices=weeks.map(w=>weekBest[w]);
   const wMin=wPrices.length?Math.min(...wPrices):0;
   const wMax=wPrices.length?Math.max(...wPrices):0;
   const wMid=wMin+(wMax-wMin)/3;const wHi=wMin+2*(wMax-wMin)/3;
   let wgHtml='';
-  weeks.forEach(w=>{{
+  weeks.forEach(w=>{
     const p=weekBest[w];
     const cls=p<=wMid?'cheap':p<=wHi?'mid':'exp';
-    wgHtml+=`<div class="week-cell ${{cls}}"><div class="wk">${{w}}</div><div class="wp">${{p.toFixed(0)}}\\u20ac</div></div>`;
-  }});
+    wgHtml+=`<div class="week-cell ${cls}"><div class="wk">${w}</div><div class="wp">${p.toFixed(0)}\\u20ac</div></div>`;
+  });
   document.getElementById('flight-week-grid').innerHTML=wgHtml||'<p style="color:#64748b">Sin datos de semanas</p>';
 
-  // History table
-  const allRows=[...eco.timestamps.map((t,i)=>({{ts:t,cabin:'Turista',price:eco.prices[i],week:eco.weeks?eco.weeks[i]:'',th:et}})),
-                  ...biz.timestamps.map((t,i)=>({{ts:t,cabin:'Business',price:biz.prices[i],week:biz.weeks?biz.weeks[i]:'',th:bt}}))];
-  allRows.sort((a,b)=>b.ts.localeCompare(a.ts));
+  // History table (newest first, sorted server-side)
   const tb=document.getElementById('flight-tbody');tb.innerHTML='';
-  allRows.slice(0,100).forEach(r=>{{
-    const ok=r.price!==null&&r.price<=r.th;
+  (d.history||[]).forEach(([ts,cabin,price,week,ok])=>{
     const tr=document.createElement('tr');
-    tr.innerHTML=`<td>${{r.ts}}</td><td>${{r.week}}</td>
-    <td><span class="bg ${{r.cabin==='Business'?'bg-y':'bg-g'}}">${{r.cabin}}</span></td>
-    <td style="font-weight:700;color:${{ok?'#4ade80':'#f87171'}}">${{r.price!==null?r.price.toFixed(0)+'\\u20ac':'N/A'}}</td>
+    tr.innerHTML=`<td>${ts}</td><td>${week}</td>
+    <td><span class="bg ${cabin==='Business'?'bg-y':'bg-g'}">${cabin}</span></td>
+    <td style="font-weight:700;color:${ok?'#4ade80':'#f87171'}">${price!==null?price.toFixed(0)+'\\u20ac':'N/A'}</td>
     <td>-</td><td>-</td>`;
     tb.appendChild(tr);
-  }});
-}}
+  });
+}
 
 // --- Trains ---
-function populateTrainSelect(){{
+function populateTrainSelect(){
   const sel=document.getElementById('train-route-select');
   sel.innerHTML='';
-  TIDS.forEach(id=>{{
+  TIDS.forEach(id=>{
     const opt=document.createElement('option');
-    opt.value=id;opt.textContent=id+' — '+TD[id].label;
+    opt.value=id;opt.textContent=id+' — '+TD[id];
     sel.appendChild(opt);
-  }});
+  });
   if(TIDS.length)renderTrainRoute(TIDS[0]);
-}}
+}
 
-function renderTrainRoute(rid){{
-  const d=TD[rid];if(!d)return;
-  const tur=d.by_cabin.TURISTA||{{timestamps:[],prices:[]}};
-  const pref=d.by_cabin.PREFERENTE||{{timestamps:[],prices:[]}};
+function renderTrainRoute(rid){
+  const d=routeData('td',rid);if(!d)return;
+  const tur=d.by_cabin.TURISTA||{timestamps:[],prices:[]};
+  const pref=d.by_cabin.PREFERENTE||{timestamps:[],prices:[]};
   const tt=d.alerts.turista_max||30,pt=d.alerts.preferente_max||60;
 
-  const tv=tur.prices.filter(p=>p!==null),pv=pref.prices.filter(p=>p!==null);
-  const tbest=tv.length?Math.min(...tv):null,pbest=pv.length?Math.min(...pv):null;
+  const tbest=d.best.TURISTA,pbest=d.best.PREFERENTE;
   const tHit=tbest!==null&&tbest<=tt,pHit=pbest!==null&&pbest<=pt;
   document.getElementById('train-best').innerHTML=`
-  <div class="best-card ${{tHit?'hit':''}}">
+  <div class="best-card ${tHit?'hit':''}">
     <div class="best-label">Mejor Turista</div>
-    <div class="best-price ${{tHit?'g':'r'}}">${{tbest!==null?tbest.toFixed(0)+'\\u20ac':'\\u2014'}}</div>
-    <div class="best-info">Umbral: ${{tt}}\\u20ac</div>
-    <div class="best-action"><a class="${{tHit?'btn-buy':'btn-wait'}}" href="https://www.renfe.com/es/es" target="_blank">${{tHit?'COMPRAR':'Esperar'}}</a></div>
+    <div class="best-price ${tHit?'g':'r'}">${tbest!==null?tbest.toFixed(0)+'\\u20ac':'\\u2014'}</div>
+    <div class="best-info">Umbral: ${tt}\\u20ac</div>
+    <div class="best-action"><a class="${tHit?'btn-buy':'btn-wait'}" href="https://www.renfe.com/es/es" target="_blank">${tHit?'COMPRAR':'Esperar'}</a></div>
   </div>
-  <div class="best-card ${{pHit?'hit':''}}">
+  <div class="best-card ${pHit?'hit':''}">
     <div class="best-label">Mejor Preferente</div>
-    <div class="best-price ${{pHit?'g':'p'}}">${{pbest!==null?pbest.toFixed(0)+'\\u20ac':'\\u2014'}}</div>
-    <div class="best-info">Umbral: ${{pt}}\\u20ac</div>
-    <div class="best-action"><a class="${{pHit?'btn-buy':'btn-wait'}}" href="https://www.renfe.com/es/es" target="_blank">${{pHit?'COMPRAR':'Esperar'}}</a></div>
+    <div class="best-price ${pHit?'g':'p'}">${pbest!==null?pbest.toFixed(0)+'\\u20ac':'\\u2014'}</div>
+    <div class="best-info">Umbral: ${pt}\\u20ac</div>
+    <div class="best-action"><a class="${pHit?'btn-buy':'btn-wait'}" href="https://www.renfe.com/es/es" target="_blank">${pHit?'COMPRAR':'Esperar'}</a></div>
   </div>`;
 
   document.getElementById('tc1-title').textContent='Turista — Umbral '+tt+'\\u20ac';
@@ -362,62 +291,249 @@ function renderTrainRoute(rid){{
   tCharts[1]=mkChart('tc2',pref.timestamps,pref.prices,pt,'#a855f7');
 
   // Week grid (turista)
-  const dateBest={{}};
-  (d.week_best||[]).filter(w=>w.cabin==='TURISTA').forEach(w=>{{
+  const dateBest={};
+  (d.week_best||[]).filter(w=>w.cabin==='TURISTA').forEach(w=>{
     if(!dateBest[w.date]||w.price<dateBest[w.date])dateBest[w.date]=w.price;
-  }});
+  });
   const dates=Object.keys(dateBest).sort();
   const dPrices=dates.map(dt=>dateBest[dt]);
   const dMin=dPrices.length?Math.min(...dPrices):0;
   const dMax=dPrices.length?Math.max(...dPrices):0;
   const dMid=dMin+(dMax-dMin)/3;const dHi=dMin+2*(dMax-dMin)/3;
   let dgHtml='';
-  dates.forEach(dt=>{{
+  dates.forEach(dt=>{
     const p=dateBest[dt];
     const cls=p<=dMid?'cheap':p<=dHi?'mid':'exp';
-    dgHtml+=`<div class="week-cell ${{cls}}"><div class="wk">${{dt}}</div><div class="wp">${{p.toFixed(0)}}\\u20ac</div></div>`;
-  }});
+    dgHtml+=`<div class="week-cell ${cls}"><div class="wk">${dt}</div><div class="wp">${p.toFixed(0)}\\u20ac</div></div>`;
+  });
   document.getElementById('train-week-grid').innerHTML=dgHtml||'<p style="color:#64748b">Sin datos</p>';
 
-  // History
-  const allRows=[...tur.timestamps.map((t,i)=>({{ts:t,cabin:'Turista',price:tur.prices[i],date:tur.dates?tur.dates[i]:'',th:tt}})),
-                  ...pref.timestamps.map((t,i)=>({{ts:t,cabin:'Preferente',price:pref.prices[i],date:pref.dates?pref.dates[i]:'',th:pt}}))];
-  allRows.sort((a,b)=>b.ts.localeCompare(a.ts));
+  // History (newest first, sorted server-side)
   const tb=document.getElementById('train-tbody');tb.innerHTML='';
-  allRows.slice(0,100).forEach(r=>{{
-    const ok=r.price!==null&&r.price<=r.th;
+  (d.history||[]).forEach(([ts,cabin,price,date,ok])=>{
     const tr=document.createElement('tr');
-    tr.innerHTML=`<td>${{r.ts}}</td><td>${{r.date}}</td>
-    <td><span class="bg ${{r.cabin==='Preferente'?'bg-p':'bg-g'}}">${{r.cabin}}</span></td>
-    <td style="font-weight:700;color:${{ok?'#4ade80':'#f87171'}}">${{r.price!==null?r.price.toFixed(0)+'\\u20ac':'N/A'}}</td>
+    tr.innerHTML=`<td>${ts}</td><td>${date}</td>
+    <td><span class="bg ${cabin==='Preferente'?'bg-p':'bg-g'}">${cabin}</span></td>
+    <td style="font-weight:700;color:${ok?'#4ade80':'#f87171'}">${price!==null?price.toFixed(0)+'\\u20ac':'N/A'}</td>
     <td>-</td><td>-</td>`;
     tb.appendChild(tr);
-  }});
-}}
+  });
+}
 
-function mkChart(id,ts,pr,th,cl){{
+function mkChart(id,ts,pr,th,cl){
   if(!ts||!ts.length)return null;
-  return new Chart(document.getElementById(id),{{type:'line',data:{{labels:ts,datasets:[
-    {{label:'Precio',data:pr,borderColor:cl,backgroundColor:cl+'20',fill:true,tension:.3,pointRadius:4,pointHoverRadius:7}},
-    {{label:'Umbral '+th+'\\u20ac',data:Array(ts.length).fill(th),borderColor:'#fbbf24',borderDash:[6,4],pointRadius:0,fill:false}}
-  ]}},options:{{responsive:true,plugins:{{legend:{{labels:{{color:'#94a3b8'}}}}}},scales:{{
-    x:{{ticks:{{color:'#64748b',maxRotation:45}},grid:{{color:'#1e293b'}}}},
-    y:{{ticks:{{color:'#64748b',callback:v=>v+'\\u20ac'}},grid:{{color:'#334155'}}}}
-  }}}}}});
-}}
+  return new Chart(document.getElementById(id),{type:'line',data:{labels:ts,datasets:[
+    {label:'Precio',data:pr,borderColor:cl,backgroundColor:cl+'20',fill:true,tension:.3,pointRadius:4,pointHoverRadius:7},
+    {label:'Umbral '+th+'\\u20ac',data:Array(ts.length).fill(th),borderColor:'#fbbf24',borderDash:[6,4],pointRadius:0,fill:false}
+  ]},options:{responsive:true,plugins:{legend:{labels:{color:'#94a3b8'}}},scales:{
+    x:{ticks:{color:'#64748b',maxRotation:45},grid:{color:'#1e293b'}},
+    y:{ticks:{color:'#64748b',callback:v=>v+'\\u20ac'},grid:{color:'#334155'}}
+  }}});
+}
 
 populateFlightSelect();
 populateTrainSelect();
-</script></body></html>"""
+"""
+
+
+# Page shell, filled per render with Template.substitute
+_DASHBOARD_HTML = Template("""<!DOCTYPE html>
+<html lang="es"><head>
+<meta charset="UTF-8"><meta name="viewport" content="width=device-width,initial-scale=1">
+<title>${company} — Travel Monitor</title>
+<script src="https://cdn.jsdelivr.net/npm/chart.js@4"></script>
+<link rel="stylesheet" href="${css_href}">
+</head><body>
+<div class="w">
+<div class="hd"><h1>Travel Monitor</h1><span class="co">${company}</span>
+<p class="sub">Vuelos + Trenes &middot; Multiruta &middot; Cada ${interval}h</p></div>
+
+<div class="tabs">
+<div class="tab tab-flight active" onclick="switchTab('flights')">Vuelos</div>
+<div class="tab tab-train" onclick="switchTab('trains')">Trenes</div>
+</div>
+
+<!-- FLIGHTS TAB -->
+<div id="tab-flights" class="tab-content active">
+<div class="route-sel">
+<label>Ruta:</label>
+<select id="flight-route-select" onchange="renderFlightRoute(this.value)"></select>
+</div>
+<div id="flight-best" class="best"></div>
+<div class="links" id="flight-links"></div>
+<div id="flight-charts" class="chs">
+<div class="ch"><h3 id="fc1-title">Turista</h3><canvas id="fc1"></canvas></div>
+<div class="ch"><h3 id="fc2-title">Business</h3><canvas id="fc2"></canvas></div>
+</div>
+<h3 style="color:#94a3b8;font-size:.85em;margin-bottom:8px">Precios por semana (Turista)</h3>
+<div id="flight-week-grid" class="week-grid"></div>
+<h3 style="color:#94a3b8;font-size:.85em;margin:12px 0 8px">Historial</h3>
+<table><thead><tr><th>Fecha</th><th>Semana</th><th>Clase</th><th>Precio</th><th>Escalas</th><th>Duracion</th></tr></thead>
+<tbody id="flight-tbody"></tbody></table>
+</div>
+
+<!-- TRAINS TAB -->
+<div id="tab-trains" class="tab-content">
+<div class="route-sel">
+<label>Ruta:</label>
+<select id="train-route-select" onchange="renderTrainRoute(this.value)"></select>
+</div>
+<div id="train-best" class="best"></div>
+<div class="links" id="train-links"><a href="https://www.renfe.com/es/es" target="_blank">Renfe</a></div>
+<div id="train-charts" class="chs">
+<div class="ch"><h3 id="tc1-title">Turista</h3><canvas id="tc1"></canvas></div>
+<div class="ch"><h3 id="tc2-title">Preferente</h3><canvas id="tc2"></canvas></div>
+</div>
+<h3 style="color:#94a3b8;font-size:.85em;margin-bottom:8px">Precios por fecha (Turista)</h3>
+<div id="train-week-grid" class="week-grid"></div>
+<h3 style="color:#94a3b8;font-size:.85em;margin:12px 0 8px">Historial</h3>
+<table><thead><tr><th>Fecha</th><th>Viaje</th><th>Clase</th><th>Precio</th><th>Tren</th><th>Horario</th></tr></thead>
+<tbody id="train-tbody"></tbody></table>
+</div>
+
+<p class="ft">${company} Travel Monitor &middot; ${now_str} &middot; Cada ${interval}h</p>
+</div>
+${flight_data_blocks}
+${train_data_blocks}
+<script>
+const FD=${flight_labels};
+const TD=${train_labels};
+const FIDS=${flight_ids};
+const TIDS=${train_ids};
+
+${page_script}</script></body></html>""")
+
+
+def generate_dashboard(config: Config):
+    """Generate interactive HTML dashboard with Flights/Trains tabs."""
+
+    # Gather all flight data
+    flight_data = {}
+    for route in config.flights:
+        rows = read_history("flight", route.id)
+        flight_data[route.id] = {
+            "route": route,
+            "rows": rows,
+        }
+
+    # Gather all train data
+    train_data = {}
+    for route in config.trains:
+        rows = read_history("train", route.id)
+        train_data[route.id] = {
+            "route": route,
+            "rows": rows,
+        }
+
+    # Build JSON data for injection
+    flight_json = {}
+    for rid, d in flight_data.items():
+        route = d["route"]
+        rows = d["rows"]
+        by_cabin = {
+            cabin: {"timestamps": [], "prices": [], "weeks": []}
+            for cabin in ("ECONOMY", "BUSINESS")
+        }
+
+        # One pass: per-cabin series + best price per (week, cabin)
+        week_best = {}
+        for r in rows:
+            ws = r.get("week_start", "")
+            cabin = r.get("cabin_class", "")
+            price = r["price"]
+            series = by_cabin.get(cabin)
+            if series is not None:
+                series["timestamps"].append(r["timestamp"][:16].replace("T", " "))
+                series["prices"].append(price)
+                series["weeks"].append(ws)
+            if price is None:
+                continue
+            key = (ws, cabin)
+            if price < week_best.get(key, math.inf):
+                week_best[key] = price
+
+        flight_json[rid] = {
+            "label": f"{route.origin_name} → {route.destination_name}",
+            "origin": route.origin,
+            "destination": route.destination,
+            "by_cabin": _chart_series(by_cabin),
+            "history": _recent_history(
+                by_cabin,
+                {"ECONOMY": "Turista", "BUSINESS": "Business"},
+                {"ECONOMY": route.alerts.get("economy_max") or 800,
+                 "BUSINESS": route.alerts.get("business_max") or 2200},
+                "weeks"),
+            "best": _best_by_cabin(week_best, by_cabin),
+            "week_best": [
+                {"price": p, "week": ws, "cabin": c} for (ws, c), p in week_best.items()
+            ],
+            "alerts": route.alerts,
+            "google_url": build_google_url(route.origin, route.destination, "", "", "economy"),
+        }
+
+    train_json = {}
+    for rid, d in train_data.items():
+        route = d["route"]
+        rows = d["rows"]
+        by_cabin = {
+            cabin: {"timestamps": [], "prices": [], "dates": []}
+            for cabin in ("TURISTA", "PREFERENTE")
+        }
+
+        week_best = {}
+        for r in rows:
+            td = r.get("travel_date", "")
+            cabin = r.get("cabin_class", "")
+            price = r["price"]
+            series = by_cabin.get(cabin)
+            if series is not None:
+                series["timestamps"].append(r["timestamp"][:16].replace("T", " "))
+                series["prices"].append(price)
+                series["dates"].append(td)
+            if price is None:
+                continue
+            key = (td, cabin)
+            if price < week_best.get(key, math.inf):
+                week_best[key] = price
+
+        train_json[rid] = {
+            "label": f"{route.origin_name} → {route.destination_name}",
+            "by_cabin": _chart_series(by_cabin),
+            "history": _recent_history(
+                by_cabin,
+                {"TURISTA": "Turista", "PREFERENTE": "Preferente"},
+                {"TURISTA": route.alerts.get("turista_max") or 30,
+                 "PREFERENTE": route.alerts.get("preferente_max") or 60},
+                "dates"),
+            "best": _best_by_cabin(week_best, by_cabin),
+            "week_best": [
+                {"price": p, "date": td, "cabin": c} for (td, c), p in week_best.items()
+            ],
+            "alerts": route.alerts,
+        }
+
+    html = _DASHBOARD_HTML.substitute(
+        css_href=CSS_FILE_NAME,
+        page_script=_DASHBOARD_JS,
+        company=config.company,
+        now_str=datetime.now().strftime('%d/%m/%Y %H:%M'),
+        interval=config.check_interval_hours,
+        flight_data_blocks=_route_data_blocks("fd", flight_json),
+        train_data_blocks=_route_data_blocks("td", train_json),
+        flight_labels=_script_json({rid: d["label"] for rid, d in flight_json.items()}),
+        train_labels=_script_json({rid: d["label"] for rid, d in train_json.items()}),
+        flight_ids=_script_json(list(flight_json)),
+        train_ids=_script_json(list(train_json)),
+    )
 
     with open(DASHBOARD_FILE, "w") as f:
         f.write(html)
+    _write_if_changed(DASHBOARD_FILE.parent / CSS_FILE_NAME, _DASHBOARD_CSS)
 
     # Also write to output/ for nginx serving
     OUTPUT_DIR.mkdir(exist_ok=True)
-    output_file = OUTPUT_DIR / "index.html"
-    with open(output_file, "w") as f:
-        f.write(html)
+    shutil.copyfile(DASHBOARD_FILE, OUTPUT_DIR / "index.html")
+    _write_if_changed(OUTPUT_DIR / CSS_FILE_NAME, _DASHBOARD_CSS)
 
-    print(f"  Dashboard: {DASHBOARD_FILE}")
+    log.info("  Dashboard: %s", DASHBOARD_FILE)
     return DASHBOARD_FILE
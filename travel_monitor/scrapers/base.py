@@ -5,9 +5,12 @@ from datetime import datetime
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PriceResult:
-    """A single price observation from any transport scraper."""
+    """A single price observation from any transport scraper.
+
+    Slotted and frozen: no per-instance __dict__, and hashable.
+    """
     timestamp: str
     route_id: str
     transport_type: str  # "flight" or "train"
@@ -25,29 +28,36 @@ class PriceResult:
     # Week tracking
     week_start: str = ""
     travel_date: str = ""
+    # Served from the scrape cache: already in the CSV history, not a new observation
+    cached: bool = field(default=False, compare=False)
 
     @property
     def has_price(self):
         return self.price is not None and self.price > 0
 
+    def to_csv_tuple(self):
+        """Return values in CSV_HEADERS order, for csv.writer."""
+        has_price = self.has_price
+        return (
+            self.timestamp,
+            self.route_id,
+            self.transport_type,
+            self.cabin_class,
+            self.price if has_price else "",
+            self.currency if has_price else "",
+            self.airline,
+            self.stops if self.transport_type == "flight" else "",
+            self.duration,
+            self.train_type,
+            self.departure_time,
+            self.arrival_time,
+            self.week_start,
+            self.travel_date,
+        )
+
     def to_csv_row(self):
         """Return dict for CSV writing."""
-        return {
-            "timestamp": self.timestamp,
-            "route_id": self.route_id,
-            "transport_type": self.transport_type,
-            "cabin_class": self.cabin_class,
-            "price": self.price if self.has_price else "",
-            "currency": self.currency if self.has_price else "",
-            "airline": self.airline,
-            "stops": self.stops if self.transport_type == "flight" else "",
-            "duration": self.duration,
-            "train_type": self.train_type,
-            "departure_time": self.departure_time,
-            "arrival_time": self.arrival_time,
-            "week_start": self.week_start,
-            "travel_date": self.travel_date,
-        }
+        return dict(zip(CSV_HEADERS, self.to_csv_tuple()))
 
 
 CSV_HEADERS = [
@@ -4,27 +4,38 @@ Supports geo-spoofing: simulates searches from multiple countries
 (ES, US, MX, CO, BR, UK, DE) to find the best price.
 """
 
+import asyncio
+import functools
+import logging
 import re
-import sys
-import time
-import subprocess
+from dataclasses import asdict
 from datetime import datetime, timedelta
 from pathlib import Path
 
-from ..utils import normalize, build_explore_url, build_explore_tfs
+from ..utils import normalize, normalize_name, build_explore_tfs, week_mondays
 from ..config import FlightRoute
+from ..cache import cache_get, cache_set
 from .base import PriceResult
 
-try:
-    from playwright.sync_api import sync_playwright
-except ImportError:
-    print("Installing playwright...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "playwright"])
-    subprocess.check_call([sys.executable, "-m", "playwright", "install", "chromium"])
-    from playwright.sync_api import sync_playwright
-
 SCRIPT_DIR = Path(__file__).parent.parent.parent
 
+log = logging.getLogger(__name__)
+
+# Priced results are reused for this long; near-term weeks only within a
+# short window, so back-to-back runs do not repeat the same live searches
+SCRAPE_CACHE_TTL = 6 * 3600
+NEAR_TERM_WEEKS = 2
+NEAR_TERM_CACHE_TTL = 10 * 60
+
+# Pages open at once on the shared browser (all routes, weeks and geos)
+MAX_OPEN_PAGES = 6
+# Week/cabin searches of a route in flight at once; they share the pages above
+MAX_ROUTE_PARALLEL = 4
+
+# A geo fare at or below this share of the route's alert threshold is good
+# enough: the remaining geos are not tried for that week/cabin
+GOOD_ENOUGH_RATIO = 0.85
+
 # Geo-spoofing profiles: different locales/currencies to find best prices
 GEO_PROFILES = [
     {
@@ -59,6 +70,45 @@ GEO_PROFILES = [
     },
 ]
 
+# Any rendered fare (e.g. "1.234 €", "$1,100", "£900", "R$ 5.000") means results are in
+_PRICE_SELECTOR = r"text=/\d\s*€|[$£]\s*\d/"
+
+# Explore lists each destination as a card: name, price, stops, duration
+_CARD_SELECTOR = "li"
+
+# Pre-seeded Google consent state, so contexts skip the consent interstitial
+# instead of loading the Flights home page just to click "Accept"
+_CONSENT_COOKIES = [
+    {"name": "CONSENT", "value": "YES+cb", "domain": ".google.com", "path": "/"},
+    {"name": "SOCS", "value": "CAI", "domain": ".google.com", "path": "/", "secure": True},
+]
+
+# Requests that never affect the page text we parse. Stylesheets stay:
+# inner_text() depends on layout, and hidden card text would leak in without CSS.
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+_BLOCKED_HOSTS = ("doubleclick.net", "google-analytics.com", "googletagservices.com",
+                  "googletagmanager.com")
+
+_CONSENT_BUTTON_SELECTOR = ", ".join(
+    f"button:has-text('{text}')"
+    for text in ("Aceptar todo", "Accept all", "Aceptar", "Alle akzeptieren")
+)
+
+_USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/122.0.0.0 Safari/537.36"
+)
+
+# Playwright already passes --disable-extensions and --no-first-run
+_LAUNCH_ARGS = ["--disable-blink-features=AutomationControlled", "--no-sandbox", "--disable-gpu"]
+
+# Shared by every geo context; locale/timezone are added per geo
+_CONTEXT_OPTIONS = {
+    "viewport": {"width": 1366, "height": 900},
+    "user_agent": _USER_AGENT,
+}
+
 # Approximate exchange rates to EUR (updated periodically)
 EXCHANGE_TO_EUR = {
     "EUR": 1.0,
@@ -70,22 +120,86 @@ EXCHANGE_TO_EUR = {
 }
 
 
+# Explore page parsing patterns (compiled once)
+_EUR_PRICE_RE = re.compile(r'([\d.]+)\s*€')
+# Currency symbols for different locales
+_CURRENCY_PRICE_RES = {
+    "EUR": _EUR_PRICE_RE,
+    "USD": re.compile(r'\$\s*([\d,]+(?:\.\d{2})?)'),
+    "GBP": re.compile(r'£\s*([\d,]+(?:\.\d{2})?)'),
+    "MXN": re.compile(r'\$\s*([\d,]+(?:\.\d{2})?)'),
+    "COP": re.compile(r'\$\s*([\d.,]+)'),
+    "BRL": re.compile(r'R\$\s*([\d.,]+)'),
+}
+_STOPS_RE = re.compile(r'^(\d+)\s*(escala|stop|Stopp|parada)', re.IGNORECASE)
+_DIRECT_RE = re.compile(r'directo|nonstop|ohne Umstieg', re.IGNORECASE)
+_DURATION_RES = (
+    re.compile(r'^(\d{1,2})\s*h\s*(\d{1,2})?\s*m'),
+    re.compile(r'^(\d{1,2})\s*Std\.\s*(\d{1,2})?\s*Min'),
+)
+
+
+def _parse_eu(amount):
+    """'1.197' / '5.000.000' / '4.500,50': dots group thousands, comma is decimal."""
+    return float(amount.replace(".", "").replace(",", "."))
+
+
+def _parse_us(amount):
+    """'1,197.00': commas group thousands, dot is decimal."""
+    return float(amount.replace(",", ""))
+
+
+# Amount parser per page currency (separators follow the geo's locale)
+PRICE_PARSERS = {
+    "EUR": _parse_eu,
+    "USD": _parse_us,
+    "GBP": _parse_us,
+    "MXN": _parse_us,
+    "COP": _parse_eu,
+    "BRL": _parse_eu,
+}
+
+
 def _to_eur(price, currency):
     """Convert a price to EUR using approximate exchange rates."""
     rate = EXCHANGE_TO_EUR.get(currency, 1.0)
     return round(price * rate, 2)
 
 
-def _accept_cookies(page):
+async def _accept_cookies(page):
     """Handle Google cookie consent dialog."""
-    for text in ["Aceptar todo", "Accept all", "Aceptar", "Alle akzeptieren"]:
-        try:
-            btn = page.locator(f"button:has-text('{text}')").first
-            btn.click(timeout=3000)
-            page.wait_for_timeout(1000)
-            return
-        except Exception:
-            pass
+    # One selector list: the browser matches any locale's button at once
+    # instead of waiting out each text in turn
+    try:
+        btn = page.locator(_CONSENT_BUTTON_SELECTOR).first
+        await btn.click(timeout=5000)
+        await page.wait_for_timeout(1000)
+    except Exception:
+        pass
+
+
+def _matching_lines(text, pattern):
+    """Yield the index of each line of text that contains a pattern match."""
+    line = pos = 0
+    last = -1
+    for m in pattern.finditer(text):
+        line += text.count("\n", pos, m.start())
+        pos = m.start()
+        if line != last:
+            last = line
+            yield line
+
+
+@functools.lru_cache(maxsize=64)
+def _names_re(names: tuple) -> re.Pattern:
+    """Matcher for any of the destination names, on normalize()d text."""
+    return re.compile("|".join(re.escape(normalize_name(n)) for n in names))
+
+
+@functools.lru_cache(maxsize=64)
+def _card_filter_re(names: tuple) -> re.Pattern:
+    """Case-insensitive matcher for any of the destination names, on raw card text."""
+    return re.compile("|".join(re.escape(n) for n in names), re.IGNORECASE)
 
 
 def _extract_explore_data(page_text, destination_names, currency="EUR"):
@@ -93,67 +207,55 @@ def _extract_explore_data(page_text, destination_names, currency="EUR"):
 
     destination_names: list of possible names (e.g. ["Ciudad de Mexico", "Mexico City"])
     """
-    names_norm = [normalize(n) for n in destination_names]
+    names_re = _names_re(tuple(destination_names))
     lines = page_text.split("\n")
     results = []
 
-    # Currency symbols for different locales
-    currency_patterns = {
-        "EUR": r'([\d.]+)\s*€',
-        "USD": r'\$\s*([\d,]+(?:\.\d{2})?)',
-        "GBP": r'£\s*([\d,]+(?:\.\d{2})?)',
-        "MXN": r'\$\s*([\d,]+(?:\.\d{2})?)',
-        "COP": r'\$\s*([\d.,]+)',
-        "BRL": r'R\$\s*([\d.,]+)',
-    }
-    price_pattern = currency_patterns.get(currency, r'([\d.]+)\s*€')
-
-    for i, line in enumerate(lines):
-        stripped = line.strip()
-        line_norm = normalize(stripped)
-        if not any(n in line_norm for n in names_norm):
-            continue
+    price_re = _CURRENCY_PRICE_RES.get(currency, _EUR_PRICE_RE)
+    parse_price = PRICE_PARSERS.get(currency, _parse_eu)
 
+    # One normalize() and one regex scan over the whole page find the
+    # destination lines; line breaks survive normalize() unchanged
+    for i in _matching_lines(normalize(page_text), names_re):
         price = None
         stops = 0
         duration_min = 0
         duration_str = ""
+        stops_seen = duration_seen = False
 
         for j in range(1, 6):
             if i + j >= len(lines):
                 break
+            # Card complete: further lines belong to the next destination
+            if price is not None and stops_seen and duration_seen:
+                break
             next_line = lines[i + j].strip()
 
             # Try EUR first (always works), then locale-specific
-            pm = re.search(r'([\d.]+)\s*€', next_line)
+            pm = _EUR_PRICE_RE.search(next_line)
             if not pm:
-                pm = re.search(price_pattern, next_line)
+                pm = price_re.search(next_line)
             if pm and price is None:
-                raw = pm.group(1).replace(",", "").replace(".", "")
-                # For EUR prices like "1.197 €", dots are thousands separators
-                # For USD prices like "$1,197.00", need different parsing
-                if currency == "EUR":
-                    price = float(pm.group(1).replace(".", ""))
-                else:
-                    clean = pm.group(1).replace(",", "")
-                    price = float(clean)
+                price = parse_price(pm.group(1))
                 continue
 
-            if re.match(r'^\d+\s*(escala|stop|Stopp|parada)', next_line, re.IGNORECASE):
-                stops = int(re.match(r'^(\d+)', next_line).group(1))
+            sm = _STOPS_RE.match(next_line)
+            if sm:
+                stops = int(sm.group(1))
+                stops_seen = True
                 continue
-            if re.search(r'directo|nonstop|ohne Umstieg', next_line, re.IGNORECASE):
+            if _DIRECT_RE.search(next_line):
                 stops = 0
+                stops_seen = True
                 continue
 
-            dm = re.match(r'^(\d{1,2})\s*h\s*(\d{1,2})?\s*m', next_line)
-            if not dm:
-                dm = re.match(r'^(\d{1,2})\s*Std\.\s*(\d{1,2})?\s*Min', next_line)
+            dm = _DURATION_RES[0].match(next_line) or _DURATION_RES[1].match(next_line)
             if dm:
                 h = int(dm.group(1))
                 m = int(dm.group(2)) if dm.group(2) else 0
                 duration_min = h * 60 + m
                 duration_str = f"{h}h {m}m" if m else f"{h}h"
+                duration_seen = True
                 continue
 
         if price and price > 10:
@@ -173,8 +275,29 @@ def _extract_explore_data(page_text, destination_names, currency="EUR"):
     return results
 
 
-def _scrape_single(page, route, cabin, dep_date, ret_date, geo=None):
+async def _block_heavy(route):
+    """Abort images, fonts, media and analytics beacons; let the rest through."""
+    request = route.request
+    if (request.resource_type in _BLOCKED_RESOURCE_TYPES
+            or any(h in request.url for h in _BLOCKED_HOSTS)):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def _new_context(browser, **kwargs):
+    """Browser context with the shared viewport/UA, consent cookies set and
+    heavy resources blocked."""
+    ctx = await browser.new_context(**_CONTEXT_OPTIONS, **kwargs)
+    await ctx.add_cookies(_CONSENT_COOKIES)
+    await ctx.route("**/*", _block_heavy)
+    return ctx
+
+
+async def _scrape_single(page, route, cabin, dep_date, ret_date, geo=None):
     """Navigate to Explore URL for a given cabin/dates and extract data."""
+    from playwright.async_api import TimeoutError as PlaywrightTimeout
+
     label = "Turista" if cabin == "economy" else "Business"
     currency = geo["currency"] if geo else "EUR"
     hl = geo["hl"] if geo else "es"
@@ -186,79 +309,128 @@ def _scrape_single(page, route, cabin, dep_date, ret_date, geo=None):
     )
     url = f"https://www.google.com/travel/explore?tfs={tfs}&tfu=GgA&hl={hl}&curr={currency}"
 
-    page.goto(url, timeout=30000, wait_until="networkidle")
-    page.wait_for_timeout(5000)
-
-    page_text = page.inner_text("body")
-    dest_names = [route.destination_name] + getattr(route, 'destination_aliases', [])
-    flights = _extract_explore_data(page_text, dest_names, currency)
+    await page.goto(url, timeout=30000, wait_until="domcontentloaded")
+    if "consent.google." in page.url:
+        # Cookies not honoured: accept on the interstitial, which redirects back
+        await _accept_cookies(page)
+        await page.wait_for_load_state("domcontentloaded", timeout=30000)
+    try:
+        await page.wait_for_selector(_PRICE_SELECTOR, timeout=15000)
+    except PlaywrightTimeout:
+        pass  # no fares rendered; parse whatever is there
+
+    dest_names = (route.destination_name, *getattr(route, 'destination_aliases', []))
+    # Only the result cards naming the destination, not the whole page
+    cards = page.locator(_CARD_SELECTOR, has_text=_card_filter_re(dest_names))
+    card_texts = await cards.all_inner_texts()
+    flights = _extract_explore_data("\n".join(card_texts), dest_names, currency) if card_texts else []
+    if not flights:
+        # Layout changed or names differ in accents only: scan the full page
+        page_text = await page.inner_text("body")
+        flights = _extract_explore_data(page_text, dest_names, currency)
 
     if flights:
         return flights[0]
     return None
 
 
-def _scrape_with_geo(route, cabin, dep_date, ret_date, browser) -> PriceResult:
-    """Scrape a single week/cabin trying multiple geo locations for best price."""
-    label = "Turista" if cabin == "economy" else "Business"
-    print(f"    [{label}] {dep_date} -> {ret_date}")
+async def _open_contexts(browser, geo_spoof):
+    """One browser context per geo profile ("ES" only without geo-spoofing).
 
-    best_price_eur = None
-    best_result = None
-    best_geo = None
-
-    for geo in GEO_PROFILES:
-        try:
-            ctx = browser.new_context(
-                viewport={"width": 1366, "height": 900},
+    Contexts live for the whole route: every week/cabin search opens a page
+    in them instead of paying for a fresh context each time.
+    """
+    if not geo_spoof:
+        return {"ES": await _new_context(browser, locale="es-ES")}
+    contexts = {}
+    try:
+        for geo in GEO_PROFILES:
+            contexts[geo["id"]] = await _new_context(
+                browser,
                 locale=geo["locale"],
                 timezone_id=geo["timezone"],
                 geolocation=geo["geolocation"],
                 permissions=["geolocation"],
-                user_agent=(
-                    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/122.0.0.0 Safari/537.36"
-                ),
             )
-            page = ctx.new_page()
+    except BaseException:
+        await _close_contexts(contexts)
+        raise
+    return contexts
 
-            # Accept cookies
-            page.goto(
-                f"https://www.google.com/travel/flights?hl={geo['hl']}&curr={geo['currency']}",
-                timeout=20000, wait_until="networkidle",
-            )
-            page.wait_for_timeout(1500)
-            _accept_cookies(page)
-
-            result = _scrape_single(page, route, cabin, dep_date, ret_date, geo)
-
-            if result:
-                price_eur = result.get("price_eur", result["price"])
-                tag = f"{geo['id']}:{result['price']}{geo['currency']}"
-                if price_eur <= 100:
-                    # Likely bad parse, skip
-                    pass
-                elif best_price_eur is None or price_eur < best_price_eur:
-                    best_price_eur = price_eur
-                    best_result = result
-                    best_geo = geo
-                    tag += " *BEST*"
-                print(f"      {tag}")
-
-            page.close()
-            ctx.close()
-            time.sleep(1)
-
-        except Exception as e:
-            print(f"      {geo['id']}: error ({e})")
+
+async def _close_contexts(contexts):
+    for ctx in contexts.values():
+        try:
+            await ctx.close()
+        except Exception:
+            pass
+
+
+async def _scrape_page(ctx, sem, route, cabin, dep_date, ret_date, geo=None):
+    """Scrape one week/cabin in a fresh page of a shared browser context."""
+    async with sem:
+        page = await ctx.new_page()
+        try:
+            return await _scrape_single(page, route, cabin, dep_date, ret_date, geo)
+        finally:
+            await page.close()
+
+
+async def _scrape_with_geo(route, cabin, dep_date, ret_date, contexts, sem) -> PriceResult:
+    """Scrape a single week/cabin trying multiple geo locations for best price.
+
+    Geo profiles run concurrently (bounded by the browser's page semaphore);
+    results are compared in GEO_PROFILES order so ties resolve as before.
+    Once one geo returns a fare well under the alert threshold, the geos
+    still pending are cancelled.
+    """
+    good_enough = route.alerts.get(f"{cabin}_max", 0) * GOOD_ENOUGH_RATIO
+    tasks = [
+        asyncio.ensure_future(
+            _scrape_page(contexts[geo["id"]], sem, route, cabin, dep_date, ret_date, geo))
+        for geo in GEO_PROFILES
+    ]
+    try:
+        for fut in asyncio.as_completed(tasks):
             try:
-                ctx.close()
+                result = await fut
             except Exception:
-                pass
+                continue
+            if result and 100 < result.get("price_eur", result["price"]) <= good_enough:
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+    outcomes = await asyncio.gather(*tasks, return_exceptions=True)
 
+    label = "Turista" if cabin == "economy" else "Business"
+    log.info("    [%s] %s -> %s", label, dep_date, ret_date)
+
+    best_price_eur = None
+    best_result = None
+    best_geo = None
+
+    for geo, result in zip(GEO_PROFILES, outcomes):
+        if isinstance(result, asyncio.CancelledError):
+            log.info("      %s: omitido (precio suficiente)", geo["id"])
+            continue
+        if isinstance(result, BaseException):
+            log.warning("      %s: error (%s)", geo["id"], result)
+            continue
+        if result:
+            price_eur = result.get("price_eur", result["price"])
+            tag = f"{geo['id']}:{result['price']}{geo['currency']}"
+            if price_eur <= 100:
+                # Likely bad parse, skip
+                pass
+            elif best_price_eur is None or price_eur < best_price_eur:
+                best_price_eur = price_eur
+                best_result = result
+                best_geo = geo
+                tag += " *BEST*"
+            log.info("      %s", tag)
     if best_result:
-        print(f"      >> Mejor: {best_price_eur:.0f}EUR via {best_geo['id']}")
+        log.info("      >> Mejor: %.0fEUR via %s", best_price_eur, best_geo["id"])
         return PriceResult(
             timestamp=datetime.now().isoformat(),
             route_id=route.id,
@@ -273,15 +445,67 @@ def _scrape_with_geo(route, cabin, dep_date, ret_date, browser) -> PriceResult:
             travel_date=dep_date,
         )
     else:
-        print(f"      Sin datos en ninguna ubicacion")
+        log.info("      Sin datos en ninguna ubicacion")
+        return PriceResult(
+            timestamp=datetime.now().isoformat(),
+            route_id=route.id,
+            transport_type="flight",
+            cabin_class=cabin.upper(),
+            week_start=dep_date,
+            travel_date=dep_date,
+        )
+
+
+async def _scrape_simple(route, cabin, dep_date, ret_date, contexts, sem) -> PriceResult:
+    """Scrape a single week/cabin from Spain only (no geo-spoofing)."""
+    data = await _scrape_page(contexts["ES"], sem, route, cabin, dep_date, ret_date)
+
+    if data:
         return PriceResult(
             timestamp=datetime.now().isoformat(),
             route_id=route.id,
             transport_type="flight",
             cabin_class=cabin.upper(),
+            price=data["price"],
+            currency="EUR",
+            airline=data.get("airline", ""),
+            stops=data.get("stops", 0),
+            duration=data.get("duration", ""),
             week_start=dep_date,
             travel_date=dep_date,
         )
+    return PriceResult(
+        timestamp=datetime.now().isoformat(),
+        route_id=route.id,
+        transport_type="flight",
+        cabin_class=cabin.upper(),
+        week_start=dep_date,
+        travel_date=dep_date,
+    )
+
+
+async def _scrape_week_cabin(route, week_idx, dep_str, ret_str, cabin,
+                             contexts, sem, geo_spoof) -> PriceResult:
+    """One week/cabin search: served from the TTL cache when possible."""
+    cache_key = (f"flight|{route.id}|{dep_str}|{ret_str}|{cabin}|"
+                 f"{'geo' if geo_spoof else 'ES'}")
+    ttl = NEAR_TERM_CACHE_TTL if week_idx < NEAR_TERM_WEEKS else SCRAPE_CACHE_TTL
+    # Shelve I/O runs in a worker thread, off the event loop
+    cached = await asyncio.to_thread(cache_get, cache_key, ttl)
+    if cached:
+        label = "Turista" if cabin == "economy" else "Business"
+        log.info("    [%s] %s -> %s (cache: %.0fEUR)", label, dep_str, ret_str, cached["price"])
+        return PriceResult(**{**cached, "cached": True})
+
+    if geo_spoof:
+        result = await _scrape_with_geo(route, cabin, dep_str, ret_str, contexts, sem)
+    else:
+        # Simple mode: single geo (Spain)
+        result = await _scrape_simple(route, cabin, dep_str, ret_str, contexts, sem)
+
+    if result.has_price:
+        await asyncio.to_thread(cache_set, cache_key, asdict(result))
+    return result
 
 
 def scrape_flight_route(route: FlightRoute, geo_spoof=True) -> list:
@@ -290,89 +514,83 @@ def scrape_flight_route(route: FlightRoute, geo_spoof=True) -> list:
     If geo_spoof=True, tries multiple country locations per week/cabin
     to find the lowest price. Each geo gets its own browser context.
     """
-    print(f"\n  === Vuelos {route.id}: {route.origin_name} -> {route.destination_name} ===")
+    return scrape_flight_routes([route], geo_spoof).get(route.id, [])
+
+
+def scrape_flight_routes(routes: list, geo_spoof=True) -> dict:
+    """Scrape several flight routes on one shared browser.
+
+    Returns {route.id: [PriceResult]}. Routes run concurrently in a single
+    event loop, so Chromium is launched once per check instead of per route.
+    """
+    return asyncio.run(_scrape_flight_routes(routes, geo_spoof))
+
+
+async def _scrape_flight_routes(routes: list, geo_spoof: bool) -> dict:
+    # Imported on first launch: the package is heavy, and --dashboard runs
+    # never need it
+    from playwright.async_api import async_playwright
+
+    try:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True, args=_LAUNCH_ARGS)
+            # One cap on open pages for the whole browser, however many
+            # routes run on it
+            page_sem = asyncio.Semaphore(MAX_OPEN_PAGES)
+            try:
+                per_route = await asyncio.gather(
+                    *(_scrape_flight_route(route, geo_spoof, browser, page_sem)
+                      for route in routes)
+                )
+            finally:
+                await browser.close()
+    except Exception as e:
+        log.exception("  Error scraping flights: %s", e)
+        return {}
+
+    return {route.id: results for route, results in zip(routes, per_route)}
+
+
+async def _scrape_flight_route(route: FlightRoute, geo_spoof: bool, browser,
+                               page_sem: asyncio.Semaphore) -> list:
+    log.info("  === Vuelos %s: %s -> %s ===", route.id, route.origin_name, route.destination_name)
     if geo_spoof:
-        print(f"  Geo-spoofing: {', '.join(g['id'] for g in GEO_PROFILES)}")
+        log.info("  Geo-spoofing: %s", ", ".join(g["id"] for g in GEO_PROFILES))
     results = []
 
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=True,
-                args=["--disable-blink-features=AutomationControlled", "--no-sandbox"],
-            )
+        # (dep, ret) ISO dates per week from next Monday, formatted once
+        weeks = [
+            (monday.isoformat(), (monday + timedelta(days=3)).isoformat())
+            for monday in week_mondays(route.weeks)
+        ]
+        units = [
+            (week_idx, dep_str, ret_str, cabin)
+            for week_idx, (dep_str, ret_str) in enumerate(weeks)
+            for cabin in route.classes
+        ]
+
+        # Week/cabin searches run concurrently; their pages count against
+        # the browser-wide page_sem
+        unit_sem = asyncio.Semaphore(MAX_ROUTE_PARALLEL)
+        contexts = await _open_contexts(browser, geo_spoof)
+
+        async def run(unit):
+            async with unit_sem:
+                return await _scrape_week_cabin(route, *unit, contexts, page_sem, geo_spoof)
 
-            # Generate week dates starting from next Monday
-            today = datetime.now().date()
-            days_until_monday = (7 - today.weekday()) % 7
-            if days_until_monday == 0:
-                days_until_monday = 7
-            next_monday = today + timedelta(days=days_until_monday)
-
-            for week_idx in range(route.weeks):
-                dep_date = next_monday + timedelta(weeks=week_idx)
-                ret_date = dep_date + timedelta(days=3)
-                dep_str = dep_date.strftime("%Y-%m-%d")
-                ret_str = ret_date.strftime("%Y-%m-%d")
-
-                for cabin in route.classes:
-                    if geo_spoof:
-                        result = _scrape_with_geo(
-                            route, cabin, dep_str, ret_str, browser
-                        )
-                    else:
-                        # Simple mode: single geo (Spain)
-                        ctx = browser.new_context(
-                            viewport={"width": 1366, "height": 900},
-                            locale="es-ES",
-                            user_agent=(
-                                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                                "Chrome/122.0.0.0 Safari/537.36"
-                            ),
-                        )
-                        page = ctx.new_page()
-                        page.goto(
-                            "https://www.google.com/travel/flights?hl=es&curr=EUR",
-                            timeout=30000, wait_until="networkidle",
-                        )
-                        page.wait_for_timeout(2000)
-                        _accept_cookies(page)
-
-                        data = _scrape_single(page, route, cabin, dep_str, ret_str)
-                        if data:
-                            result = PriceResult(
-                                timestamp=datetime.now().isoformat(),
-                                route_id=route.id,
-                                transport_type="flight",
-                                cabin_class=cabin.upper(),
-                                price=data["price"],
-                                currency="EUR",
-                                airline=data.get("airline", ""),
-                                stops=data.get("stops", 0),
-                                duration=data.get("duration", ""),
-                                week_start=dep_str,
-                                travel_date=dep_str,
-                            )
-                        else:
-                            result = PriceResult(
-                                timestamp=datetime.now().isoformat(),
-                                route_id=route.id,
-                                transport_type="flight",
-                                cabin_class=cabin.upper(),
-                                week_start=dep_str,
-                                travel_date=dep_str,
-                            )
-                        page.close()
-                        ctx.close()
-
-                    results.append(result)
-
-            browser.close()
+        try:
+            outcomes = await asyncio.gather(*(run(u) for u in units), return_exceptions=True)
+        finally:
+            await _close_contexts(contexts)
+        # gather keeps submission order: results stay week-major, cabin-minor
+        for (_, dep_str, _, cabin), outcome in zip(units, outcomes):
+            if isinstance(outcome, BaseException):
+                log.warning("    [%s] %s: error (%s)", cabin, dep_str, outcome)
+                continue
+            results.append(outcome)
 
     except Exception as e:
-        print(f"  Error scraping flights: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("  Error scraping flights %s: %s", route.id, e)
 
     return results
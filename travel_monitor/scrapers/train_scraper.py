@@ -10,24 +10,24 @@ intercept Playwright click events on the search form. The solution is to
 use JavaScript focus() + keyboard typing instead of clicking inputs.
 """
 
+import asyncio
+import functools
+import heapq
+import logging
 import re
-import sys
-import time
-import subprocess
-from datetime import datetime, timedelta
+from dataclasses import asdict
+from datetime import date, datetime
+from operator import itemgetter
 from typing import Optional
 from urllib.parse import quote
 
-try:
-    from playwright.sync_api import sync_playwright
-except ImportError:
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "playwright"])
-    subprocess.check_call([sys.executable, "-m", "playwright", "install", "chromium"])
-    from playwright.sync_api import sync_playwright
-
 from ..config import TrainRoute
+from ..cache import cache_get, cache_set
+from ..utils import week_mondays
 from .base import PriceResult
 
+log = logging.getLogger(__name__)
+
 # Station search terms for Renfe autocomplete
 RENFE_STATION_NAMES = {
     "MADRI": "Madrid",
@@ -52,14 +52,154 @@ OMIO_SLUGS = {
     "MALAG": "Malaga",
 }
 
+# Priced results are reused for this long; near-term weeks only within a
+# short window, so back-to-back runs do not repeat the same live searches
+SCRAPE_CACHE_TTL = 6 * 3600
+NEAR_TERM_WEEKS = 2
+NEAR_TERM_CACHE_TTL = 10 * 60
+
+# Renfe autocomplete picks (visible label + station code) hardly ever change
+STATION_CACHE_TTL = 30 * 86400
+
+# Train type labels, matched case-insensitively in priority order
+TRAIN_TYPES = tuple(
+    (label.lower(), label)
+    for label in ("AVE", "ALVIA", "AVLO", "Talgo", "Intercity", "Regional", "MD", "Avant")
+)
+
+# Date searches of a route in flight at once (each in its own context; all
+# routes of a check share one browser)
+TRAIN_CONCURRENCY = 4
+# Provider tabs open at once on that browser, across all routes and dates
+MAX_OPEN_PAGES = 6
+# Seconds a provider has on its tab before the next fallback is started
+# alongside it (a miss starts the next one straight away)
+PROVIDER_HEAD_START = 20
+
+# Any rendered euro amount (e.g. "34,70 €") means results are in
+_PRICE_SELECTOR = r"text=/\d\s*€/"
+
+# Requests that never affect the text we parse. Stylesheets stay: inner_text()
+# depends on layout, and the Renfe form is driven through the rendered page.
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media", "texttrack"})
+_BLOCKED_HOSTS_RE = re.compile(
+    r"google-analytics\.com|googletagmanager\.com|doubleclick\.net|facebook\.(?:com|net)"
+    r"|hotjar\.com|segment\.(?:com|io)|newrelic\.com|nr-data\.net"
+    r"|adobedtm\.com|omtrdc\.net|demdex\.net|optimizely\.com"
+)
+
+# Results region of the provider pages (nested matches only repeat text)
+_RESULTS_SELECTOR = "main, [role='main']"
+
 _USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
     "AppleWebKit/537.36 (KHTML, like Gecko) "
     "Chrome/125.0.0.0 Safari/537.36"
 )
 
+# Playwright already passes --disable-extensions and --no-first-run
+_LAUNCH_ARGS = [
+    "--no-sandbox", "--disable-blink-features=AutomationControlled",
+    "--disable-dev-shm-usage", "--disable-gpu",
+]
+
+# Every provider sees the same Spanish desktop browser
+_CONTEXT_OPTIONS = {
+    "viewport": {"width": 1366, "height": 900},
+    "locale": "es-ES",
+    "timezone_id": "Europe/Madrid",
+    "user_agent": _USER_AGENT,
+}
+
+# Results parsing patterns (compiled once)
+# Renfe lines: "07:14 h", "2 horas 22 minutos", "34,70 €"
+# The three line kinds of a train card in one alternation (they never overlap)
+_RENFE_LINE_RE = re.compile(
+    r'^(?:(?P<time>\d{1,2}:\d{2})\s*h'
+    r'|(?P<hours>\d+)\s+horas?\s*(?P<mins>\d+)?\s*(?:minutos?)?'
+    r'|(?P<price>\d{1,3}(?:[.,]\d{2})?)\s*€)$'
+)
+# Trainline/Omio: prices, times and "2h 30m" durations anywhere in the text
+# An amount ending at the "€" of the searched slice
+_PRICE_RE = re.compile(r'(\d{1,3}(?:[.,]\d{2})?)\s*€\Z')
+_TIME_RE = re.compile(r'(\d{1,2}:\d{2})')
+_DURATION_RE = re.compile(r'(\d{1,2})\s*h\s*(\d{1,2})?\s*m')
+
+
+async def _block_heavy(route):
+    """Abort images, fonts, media and tracking requests; let the rest through."""
+    request = route.request
+    if (request.resource_type in _BLOCKED_RESOURCE_TYPES
+            or _BLOCKED_HOSTS_RE.search(request.url)):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def _new_context(browser, storage_state: Optional[dict] = None):
+    """Fresh context on the shared browser, heavy resources blocked.
+
+    storage_state seeds it with the cookies/localStorage of an earlier
+    search (consent already given, provider session already set).
+    """
+    ctx = await browser.new_context(**_CONTEXT_OPTIONS, storage_state=storage_state)
+    await ctx.route("**/*", _block_heavy)
+    return ctx
+
+
+async def _wait_for_prices(page, timeout=15000):
+    """Return as soon as fares render; on timeout, parse whatever is there."""
+    from playwright.async_api import TimeoutError as PlaywrightTimeout
+
+    try:
+        await page.wait_for_selector(_PRICE_SELECTOR, timeout=timeout)
+    except PlaywrightTimeout:
+        pass
+
+
+async def _settle(page, timeout=5000):
+    """Let lazy-loaded results finish fetching, without a fixed sleep."""
+    from playwright.async_api import TimeoutError as PlaywrightTimeout
+
+    try:
+        await page.wait_for_load_state("networkidle", timeout=timeout)
+    except PlaywrightTimeout:
+        pass
+
+
+async def _scroll_for_more(page, rounds=4, timeout=1500):
+    """Scroll to trigger lazy-loaded results until the page stops growing.
+
+    Each round waits for the document to get taller instead of sleeping a
+    fixed time, and the first scroll that loads nothing new ends it.
+    """
+    from playwright.async_api import TimeoutError as PlaywrightTimeout
+
+    for _ in range(rounds):
+        height = await page.evaluate(
+            "() => { window.scrollTo(0, document.body.scrollHeight);"
+            " return document.body.scrollHeight; }")
+        try:
+            await page.wait_for_function(
+                "h => document.body.scrollHeight > h", arg=height, timeout=timeout)
+        except PlaywrightTimeout:
+            break
+
+
+async def _extract_page(page, extract) -> list:
+    """Parse the page's main region first; fall back to the whole body.
+
+    The header mega-menus, footer and cookie banners are outside <main>, so
+    usually far less text crosses the Playwright bridge and gets scanned.
+    """
+    texts = await page.locator(_RESULTS_SELECTOR).all_inner_texts()
+    results = extract("\n".join(texts)) if texts else []
+    if not results:
+        results = extract(await page.inner_text("body"))
+    return results
+
 
-def _accept_cookies(page):
+async def _accept_cookies(page):
     """Handle cookie consent banners on various sites."""
     for selector in [
         "button#onetrust-accept-btn-handler",
@@ -71,9 +211,9 @@ def _accept_cookies(page):
     ]:
         try:
             btn = page.locator(selector).first
-            if btn.is_visible(timeout=1500):
-                btn.click(timeout=2000)
-                page.wait_for_timeout(500)
+            if await btn.is_visible(timeout=1500):
+                await btn.click(timeout=2000)
+                await page.wait_for_timeout(500)
                 return
         except Exception:
             pass
@@ -89,58 +229,53 @@ def _extract_renfe_results(text: str) -> list:
         [Más rápido / Precio más bajo]
         Precio desde
         XX,XX €
-    """
-    results = []
-    lines = text.split("\n")
 
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
+    Trains are returned in page order.
+    """
+    # Classify every line once. "Enlace" markers and labels match no kind
+    # and drop out here, so each train is read off the tagged lines only
+    tagged = []
+    for n, line in enumerate(text.split("\n")):
+        lm = _RENFE_LINE_RE.match(line.strip())
+        if lm:
+            tagged.append((n, lm.lastgroup, lm))
 
-        # Look for departure time pattern: "07:14 h"
-        dep_match = re.match(r'^(\d{1,2}:\d{2})\s*h$', line)
-        if not dep_match:
-            i += 1
+    results = []
+    for k, (n, kind, lm) in enumerate(tagged):
+        # Departure time: "07:14 h"
+        if kind != "time":
             continue
 
-        dep_time = dep_match.group(1)
+        dep_time = lm.group("time")
         duration = ""
         arr_time = ""
         price = None
-        has_connection = False
 
-        # Scan next lines for duration, arrival, and price
-        # Range is 14 to handle trains with connections (Enlace)
-        for j in range(i + 1, min(i + 14, len(lines))):
-            jline = lines[j].strip()
-
-            # Skip "Enlace" marker
-            if jline.lower() == "enlace":
-                has_connection = True
-                continue
+        # Look at the next 13 lines for duration, arrival and price
+        # (a train with a connection (Enlace) spans that many)
+        for j in range(k + 1, len(tagged)):
+            jn, jkind, jm = tagged[j]
+            if jn >= n + 14:
+                break
 
             # Duration: "2 horas 22 minutos" or "X horas"
-            dur_m = re.match(r'^(\d+)\s+horas?\s*(\d+)?\s*(minutos?)?$', jline)
-            if dur_m:
+            if jkind in ("hours", "mins"):
                 # Only take the first duration (trip), skip connection duration
                 if not duration:
-                    h = int(dur_m.group(1))
-                    m = int(dur_m.group(2)) if dur_m.group(2) else 0
+                    h = int(jm.group("hours"))
+                    m = int(jm.group("mins")) if jm.group("mins") else 0
                     duration = f"{h}h {m}m" if m else f"{h}h"
                 continue
 
             # Arrival time: "09:36 h"
-            arr_m = re.match(r'^(\d{1,2}:\d{2})\s*h$', jline)
-            if arr_m and not arr_time:
-                arr_time = arr_m.group(1)
+            if jkind == "time":
+                if not arr_time:
+                    arr_time = jm.group("time")
                 continue
 
             # Price: "34,70 €"
-            price_m = re.match(r'^(\d{1,3}(?:[.,]\d{2})?)\s*€$', jline)
-            if price_m:
-                raw = price_m.group(1).replace(",", ".")
-                price = float(raw)
-                break
+            price = float(jm.group("price").replace(",", "."))
+            break
 
         if price and 5 < price < 500:
             results.append({
@@ -151,40 +286,87 @@ def _extract_renfe_results(text: str) -> list:
                 "duration": duration,
             })
 
-        i += 1
-
-    results.sort(key=lambda x: x["price"])
     return results
 
 
-def _extract_generic_prices(text: str) -> list:
-    """Generic price extraction for Trainline/Omio pages."""
+def _line_context(text: str, line_start: int, pos: int, radius: int = 3) -> str:
+    """The line holding pos plus up to radius lines either side.
+
+    line_start is the index of the newline before that line (-1 on the
+    first line). Slices the text in place of splitting it into lines.
+    """
+    start = line_start
+    for _ in range(radius):
+        if start < 0:
+            break
+        start = text.rfind("\n", 0, start)
+    end = text.find("\n", pos)
+    for _ in range(radius):
+        if end < 0:
+            break
+        end = text.find("\n", end + 1)
+    return text[start + 1:end if end >= 0 else len(text)]
+
+
+def _euro_amounts(text: str):
+    """Yield (start, end, amount) for every "34,70 €"-style amount in text.
+
+    Driven by str.find("€") rather than a regex scan of the whole page: the
+    regex only runs on the few characters in front of each euro sign. The
+    amount can start at most 6 characters before the whitespace run that
+    precedes its "€", and never before the previous "€".
+    """
+    lo = 0
+    pos = text.find("€")
+    while pos >= 0:
+        ws_start = lo + len(text[lo:pos].rstrip())
+        start = max(lo, ws_start - 7)
+        m = _PRICE_RE.search(text, start, pos + 1)
+        if m:
+            yield m.start(), pos + 1, m.group(1)
+        lo = pos + 1
+        pos = text.find("€", lo)
+
+
+def _extract_generic_prices(text: str, limit: Optional[int] = None) -> list:
+    """Generic price extraction for Trainline/Omio pages.
+
+    With limit, only the limit cheapest entries are kept (same as slicing the
+    full sorted list), and no context is parsed for prices that cannot make it.
+    """
     line_prices = []
-    lines = text.split("\n")
+    raw_prices = set()  # every amount, in case no line yields a fare
+    last_line = None
 
-    for i, line in enumerate(lines):
-        stripped = line.strip()
-        pm = re.search(r'(\d{1,3}(?:[.,]\d{2})?)\s*€', stripped)
-        if not pm:
+    # One pass over the whole text; the first price on each line counts
+    for start, end, amount in _euro_amounts(text):
+        if not line_prices:
+            p = float(amount.replace(",", "."))
+            if 5 < p < 500:
+                raw_prices.add(p)
+        if "\n" in text[start:end]:
+            continue  # amount and "€" on different lines
+        line_start = text.rfind("\n", 0, start)
+        if line_start == last_line:
             continue
-        raw = pm.group(1).replace(",", ".")
+        last_line = line_start
+        raw = amount.replace(",", ".")
         price = float(raw)
         if price < 5 or price > 500:
             continue
+        if limit and len(line_prices) >= limit and price >= line_prices[-1]["price"]:
+            continue
 
-        context = "\n".join(lines[max(0, i - 3):i + 4])
+        context = _line_context(text, line_start, start)
 
-        train_type = ""
-        for tt in ["AVE", "ALVIA", "AVLO", "Talgo", "Intercity", "Regional", "MD", "Avant"]:
-            if tt.lower() in context.lower():
-                train_type = tt
-                break
+        context_low = context.lower()
+        train_type = next((label for kw, label in TRAIN_TYPES if kw in context_low), "")
 
-        times = re.findall(r'(\d{1,2}:\d{2})', context)
+        times = _TIME_RE.findall(context)
         dep_time = times[0] if times else ""
         arr_time = times[1] if len(times) > 1 else ""
 
-        dur_m = re.search(r'(\d{1,2})\s*h\s*(\d{1,2})?\s*m', context)
+        dur_m = _DURATION_RE.search(context)
         duration = ""
         if dur_m:
             h = int(dur_m.group(1))
@@ -198,149 +380,165 @@ def _extract_generic_prices(text: str) -> list:
             "arrival_time": arr_time,
             "duration": duration,
         })
+        if limit:
+            # Stable sort: among equal prices the earliest on the page stays first
+            line_prices.sort(key=itemgetter("price"))
+            del line_prices[limit:]
 
     if not line_prices:
-        raw_prices = set()
-        for m in re.finditer(r'(\d{1,3}(?:[.,]\d{2})?)\s*€', text):
-            raw = m.group(1).replace(",", ".")
-            p = float(raw)
-            if 5 < p < 500:
-                raw_prices.add(p)
-        for p in sorted(raw_prices)[:5]:
+        for p in heapq.nsmallest(5, raw_prices):
             line_prices.append({
                 "price": p, "train_type": "", "departure_time": "",
                 "arrival_time": "", "duration": "",
             })
 
-    line_prices.sort(key=lambda x: x["price"])
-    return line_prices
+    line_prices.sort(key=itemgetter("price"))
+    return line_prices[:limit] if limit else line_prices
 
 
 # ---------------------------------------------------------------------------
 # Provider 1: Renfe (JS focus + keyboard — bypasses overlay)
 # ---------------------------------------------------------------------------
 
-def _scrape_renfe(route: TrainRoute, travel_date: str, cabin: str) -> Optional[dict]:
-    """Scrape Renfe using JS focus + keyboard typing to bypass overlay menus."""
+async def _fill_station(page, field_id: str, code_field: str, station: str) -> bool:
+    """Fill a Renfe station field. Returns True if the pick came from the cache.
+
+    A cached pick is set by JS, like the date. Otherwise the station is typed
+    into the autocomplete and the first suggestion taken, waiting for the
+    suggestion list and then for the hidden station code the pick fills in;
+    on timeout it carries on, and the form check in _scrape_renfe reports
+    what is missing.
+    """
+    from playwright.async_api import TimeoutError as PlaywrightTimeout
+
+    pick = await asyncio.to_thread(cache_get, _station_key(station), STATION_CACHE_TTL)
+    if pick:
+        await page.evaluate("""([field, codeField, label, code]) => {
+            document.getElementById(field).value = label;
+            document.querySelector(`[name=${codeField}]`).value = code;
+        }""", [field_id, code_field, *pick])
+        return True
+
+    await page.evaluate(f"document.getElementById('{field_id}').focus()")
+    await page.keyboard.type(station, delay=50)
+    try:
+        await page.wait_for_selector("[role='option']", timeout=3000)
+    except PlaywrightTimeout:
+        pass
+    await page.keyboard.press("ArrowDown")
+    await page.wait_for_timeout(100)
+    await page.keyboard.press("Enter")
+    try:
+        await page.wait_for_function(
+            f"() => document.querySelector('[name={code_field}]').value", timeout=3000)
+    except PlaywrightTimeout:
+        pass
+    return False
+
+
+async def _remember_station(page, field_id: str, code_field: str, station: str):
+    """Cache the autocomplete pick of a station for later searches."""
+    pick = await page.evaluate("""([field, codeField]) => [
+        document.getElementById(field).value,
+        document.querySelector(`[name=${codeField}]`).value,
+    ]""", [field_id, code_field])
+    await asyncio.to_thread(cache_set, _station_key(station), pick)
+
+
+def _station_key(station: str) -> str:
+    return f"renfe_station|{station}"
+
+
+async def _scrape_renfe(route: TrainRoute, travel_date: date,
+                        page) -> Optional[dict]:
+    """Scrape Renfe using JS focus + keyboard typing to bypass overlay menus.
+
+    Returns the cheapest fare found, or None.
+    """
     origin_name = RENFE_STATION_NAMES.get(route.origin_code, route.origin_name)
     dest_name = RENFE_STATION_NAMES.get(route.destination_code, route.destination_name)
 
-    try:
-        dt = datetime.strptime(travel_date, "%Y-%m-%d")
-        date_dd_mm = dt.strftime("%d/%m/%Y")
-    except ValueError:
-        return None
+    date_dd_mm = f"{travel_date.day:02d}/{travel_date.month:02d}/{travel_date.year}"
 
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=True,
-                args=["--no-sandbox", "--disable-blink-features=AutomationControlled",
-                       "--disable-dev-shm-usage"],
-            )
-            ctx = browser.new_context(
-                viewport={"width": 1366, "height": 900},
-                locale="es-ES",
-                timezone_id="Europe/Madrid",
-                user_agent=_USER_AGENT,
-            )
-            page = ctx.new_page()
-
-            page.goto("https://www.renfe.com/es/es", timeout=30000, wait_until="domcontentloaded")
-            page.wait_for_timeout(4000)
-            _accept_cookies(page)
-            page.wait_for_timeout(500)
-
-            # === ORIGIN (JS focus + keyboard — no click, no overlay issue) ===
-            page.evaluate("document.getElementById('origin').focus()")
-            page.wait_for_timeout(200)
-            page.keyboard.type(origin_name, delay=50)
-            page.wait_for_timeout(1500)
-            page.keyboard.press("ArrowDown")
-            page.wait_for_timeout(100)
-            page.keyboard.press("Enter")
-            page.wait_for_timeout(500)
-
-            # === DESTINATION (same approach) ===
-            page.evaluate("document.getElementById('destination').focus()")
-            page.wait_for_timeout(200)
-            page.keyboard.type(dest_name, delay=50)
-            page.wait_for_timeout(1500)
-            page.keyboard.press("ArrowDown")
-            page.wait_for_timeout(100)
-            page.keyboard.press("Enter")
-            page.wait_for_timeout(500)
-
-            # === DATE (set hidden field directly via JS) ===
-            page.evaluate(f"""() => {{
-                document.querySelector('[name=FechaIdaSel]').value = '{date_dd_mm}';
-                document.getElementById('first-input').value = '{date_dd_mm}';
-            }}""")
-            page.wait_for_timeout(200)
-
-            # === Verify form state ===
-            state = page.evaluate("""() => ({
-                o: document.querySelector('[name=cdgoOrigen]').value,
-                d: document.querySelector('[name=cdgoDestino]').value,
-                f: document.querySelector('[name=FechaIdaSel]').value,
-            })""")
-            if not state["o"] or not state["d"]:
-                print(f"        Renfe: form incomplete (o={state['o']}, d={state['d']})")
-                browser.close()
-                return None
-
-            # === SEARCH (force click to bypass any remaining overlays) ===
-            searched = False
-            for sel in [
-                "button:has-text('Buscar billete')",
-                "button:has-text('Buscar')",
-                "button[type='submit']",
-            ]:
-                try:
-                    page.locator(sel).first.click(timeout=3000, force=True)
-                    searched = True
-                    break
-                except Exception:
-                    continue
-
-            if not searched:
-                # Last resort: submit form via JS
-                page.evaluate("""() => {
-                    const form = document.querySelector('form[action*="buscarTren"]');
-                    if (form) form.submit();
-                }""")
-
-            # Wait for results page
-            page.wait_for_timeout(10000)
-
-            # Check we landed on results
-            url = page.url
-            if "venta.renfe.com" not in url:
-                print(f"        Renfe: unexpected URL {url}")
-                browser.close()
-                return None
-
-            body_text = page.inner_text("body")
-            browser.close()
-
-            # Parse Renfe-specific results format
-            results = _extract_renfe_results(body_text)
-
-            if not results:
-                return None
-
-            # For turista: return cheapest; for preferente: estimate ~1.6x turista
-            if cabin == "turista":
-                return results[0]
-            else:
-                # Preferente prices are not directly visible on results page
-                # (would need to click a train). Estimate from turista.
-                cheapest = results[0].copy()
-                cheapest["price"] = round(cheapest["price"] * 1.6, 2)
-                return cheapest
+        await page.goto("https://www.renfe.com/es/es", timeout=30000, wait_until="load")
+        await page.wait_for_selector("#origin", timeout=10000)
+        await _accept_cookies(page)
+
+        # === ORIGIN / DESTINATION (JS focus + keyboard — no click, no overlay issue) ===
+        stations = (("origin", "cdgoOrigen", origin_name),
+                    ("destination", "cdgoDestino", dest_name))
+        from_cache = [await _fill_station(page, *field) for field in stations]
+
+        # === DATE (set hidden field directly via JS) ===
+        await page.evaluate(f"""() => {{
+            document.querySelector('[name=FechaIdaSel]').value = '{date_dd_mm}';
+            document.getElementById('first-input').value = '{date_dd_mm}';
+        }}""")
+
+        # === Verify form state ===
+        state = await page.evaluate("""() => ({
+            o: document.querySelector('[name=cdgoOrigen]').value,
+            d: document.querySelector('[name=cdgoDestino]').value,
+            f: document.querySelector('[name=FechaIdaSel]').value,
+        })""")
+        if not state["o"] or not state["d"]:
+            log.warning("        Renfe: form incomplete (o=%s, d=%s)", state["o"], state["d"])
+            return None
+        for field, cached in zip(stations, from_cache):
+            if not cached:
+                await _remember_station(page, *field)
+
+        # === SEARCH (force click to bypass any remaining overlays) ===
+        searched = False
+        for sel in [
+            "button:has-text('Buscar billete')",
+            "button:has-text('Buscar')",
+            "button[type='submit']",
+        ]:
+            try:
+                await page.locator(sel).first.click(timeout=3000, force=True)
+                searched = True
+                break
+            except Exception:
+                continue
+
+        if not searched:
+            # Last resort: submit form via JS
+            await page.evaluate("""() => {
+                const form = document.querySelector('form[action*="buscarTren"]');
+                if (form) form.submit();
+            }""")
+
+        # Wait for the results page and its fares
+        from playwright.async_api import TimeoutError as PlaywrightTimeout
+        try:
+            await page.wait_for_url("**://venta.renfe.com/**", timeout=15000)
+        except PlaywrightTimeout:
+            pass
+        else:
+            await _wait_for_prices(page)
+
+        # Check we landed on results
+        url = page.url
+        if "venta.renfe.com" not in url:
+            log.warning("        Renfe: unexpected URL %s", url)
+            # A stale cached pick may be why the search was rejected
+            for (_, _, station), cached in zip(stations, from_cache):
+                if cached:
+                    await asyncio.to_thread(cache_set, _station_key(station), None)
+            return None
+
+        # Parse Renfe-specific results format
+        results = await _extract_page(page, _extract_renfe_results)
+
+        if not results:
+            return None
+        # Only the cheapest fare is used: one pass, no sort
+        return min(results, key=itemgetter("price"))
 
     except Exception as e:
-        print(f"        Renfe error: {e}")
+        log.warning("        Renfe error: %s", e)
 
     return None
 
@@ -349,7 +547,8 @@ def _scrape_renfe(route: TrainRoute, travel_date: str, cabin: str) -> Optional[d
 # Provider 2: Trainline (direct URL — no form interaction)
 # ---------------------------------------------------------------------------
 
-def _scrape_trainline(route: TrainRoute, travel_date: str, cabin: str) -> Optional[dict]:
+async def _scrape_trainline(route: TrainRoute, travel_date: date,
+                            page) -> Optional[dict]:
     """Scrape Trainline search results via direct URL."""
     origin_urn = TRAINLINE_URNS.get(route.origin_code)
     dest_urn = TRAINLINE_URNS.get(route.destination_code)
@@ -357,11 +556,7 @@ def _scrape_trainline(route: TrainRoute, travel_date: str, cabin: str) -> Option
     if not origin_urn or not dest_urn:
         return None
 
-    try:
-        dt = datetime.strptime(travel_date, "%Y-%m-%d")
-        outward = dt.strftime("%Y-%m-%dT06:00:00")
-    except ValueError:
-        return None
+    outward = f"{travel_date.isoformat()}T06:00:00"
 
     url = (
         f"https://www.thetrainline.com/book/results?"
@@ -372,45 +567,19 @@ def _scrape_trainline(route: TrainRoute, travel_date: str, cabin: str) -> Option
     )
 
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=True,
-                args=["--no-sandbox", "--disable-blink-features=AutomationControlled",
-                       "--disable-dev-shm-usage"],
-            )
-            ctx = browser.new_context(
-                viewport={"width": 1366, "height": 900},
-                locale="es-ES",
-                timezone_id="Europe/Madrid",
-                user_agent=_USER_AGENT,
-            )
-            page = ctx.new_page()
-
-            page.goto(url, timeout=30000, wait_until="domcontentloaded")
-            page.wait_for_timeout(5000)
-            _accept_cookies(page)
-            page.wait_for_timeout(1000)
-
-            # Scroll to trigger lazy-loaded results
-            for _ in range(4):
-                page.evaluate("window.scrollBy(0, 400)")
-                page.wait_for_timeout(1500)
-
-            page.wait_for_timeout(3000)
-            body_text = page.inner_text("body")
-            browser.close()
-
-            results = _extract_generic_prices(body_text)
-            if results:
-                if cabin == "turista":
-                    return results[0]
-                else:
-                    r = results[0].copy()
-                    r["price"] = round(r["price"] * 1.6, 2)
-                    return r
+        await page.goto(url, timeout=30000, wait_until="domcontentloaded")
+        await _wait_for_prices(page)
+        await _accept_cookies(page)
+        await _scroll_for_more(page)
+
+        await _settle(page)
+        # Only the cheapest fare is used
+        results = await _extract_page(page, functools.partial(_extract_generic_prices, limit=1))
+        if results:
+            return results[0]
 
     except Exception as e:
-        print(f"        Trainline error: {e}")
+        log.warning("        Trainline error: %s", e)
 
     return None
 
@@ -419,59 +588,43 @@ def _scrape_trainline(route: TrainRoute, travel_date: str, cabin: str) -> Option
 # Provider 3: Omio (direct URL — no form interaction)
 # ---------------------------------------------------------------------------
 
-def _scrape_omio(route: TrainRoute, travel_date: str, cabin: str) -> Optional[dict]:
+async def _scrape_omio(route: TrainRoute, travel_date: date,
+                       page) -> Optional[dict]:
     """Scrape Omio (formerly GoEuro) search results via direct URL."""
     origin = OMIO_SLUGS.get(route.origin_code, route.origin_name)
     dest = OMIO_SLUGS.get(route.destination_code, route.destination_name)
 
     url = (
         f"https://www.omio.es/search-frontend/results/"
-        f"{quote(origin)}/{quote(dest)}/{travel_date}/1"
+        f"{quote(origin)}/{quote(dest)}/{travel_date.isoformat()}/1"
     )
 
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(
-                headless=True,
-                args=["--no-sandbox", "--disable-blink-features=AutomationControlled",
-                       "--disable-dev-shm-usage"],
-            )
-            ctx = browser.new_context(
-                viewport={"width": 1366, "height": 900},
-                locale="es-ES",
-                timezone_id="Europe/Madrid",
-                user_agent=_USER_AGENT,
-            )
-            page = ctx.new_page()
-
-            page.goto(url, timeout=30000, wait_until="domcontentloaded")
-            page.wait_for_timeout(5000)
-            _accept_cookies(page)
-            page.wait_for_timeout(1000)
-
-            for _ in range(4):
-                page.evaluate("window.scrollBy(0, 400)")
-                page.wait_for_timeout(1500)
-
-            page.wait_for_timeout(3000)
-            body_text = page.inner_text("body")
-            browser.close()
-
-            results = _extract_generic_prices(body_text)
-            if results:
-                if cabin == "turista":
-                    return results[0]
-                else:
-                    r = results[0].copy()
-                    r["price"] = round(r["price"] * 1.6, 2)
-                    return r
+        await page.goto(url, timeout=30000, wait_until="domcontentloaded")
+        await _wait_for_prices(page)
+        await _accept_cookies(page)
+        await _scroll_for_more(page)
+
+        await _settle(page)
+        # Only the cheapest fare is used
+        results = await _extract_page(page, functools.partial(_extract_generic_prices, limit=1))
+        if results:
+            return results[0]
 
     except Exception as e:
-        print(f"        Omio error: {e}")
+        log.warning("        Omio error: %s", e)
 
     return None
 
 
+# Fallback order: Renfe -> Trainline -> Omio
+_PROVIDERS = (
+    ("Renfe", _scrape_renfe),
+    ("Trainline", _scrape_trainline),
+    ("Omio", _scrape_omio),
+)
+
+
 # ---------------------------------------------------------------------------
 # Main entry point
 # ---------------------------------------------------------------------------
@@ -482,65 +635,251 @@ def scrape_train_route(route: TrainRoute) -> list:
     Tries providers in order: Renfe -> Trainline -> Omio.
     Returns list of PriceResult.
     """
-    print(f"\n  === Trenes {route.id}: {route.origin_name} -> {route.destination_name} ===")
-    results = []
+    return scrape_train_routes([route]).get(route.id, [])
 
-    today = datetime.now().date()
-    days_until_monday = (7 - today.weekday()) % 7
-    if days_until_monday == 0:
-        days_until_monday = 7
-    next_monday = today + timedelta(days=days_until_monday)
-
-    for week_idx in range(route.weeks):
-        travel_date = next_monday + timedelta(weeks=week_idx)
-        date_str = travel_date.strftime("%Y-%m-%d")
-
-        for cabin in route.classes:
-            label = "Turista" if cabin == "turista" else "Preferente"
-            print(f"    [{label}] {date_str}")
-
-            data = None
-
-            # 1. Renfe
-            data = _scrape_renfe(route, date_str, cabin)
-
-            # 2. Trainline fallback
-            if not data or not data.get("price"):
-                print(f"      Renfe sin datos, Trainline...")
-                data = _scrape_trainline(route, date_str, cabin)
-
-            # 3. Omio fallback
-            if not data or not data.get("price"):
-                print(f"      Trainline sin datos, Omio...")
-                data = _scrape_omio(route, date_str, cabin)
-
-            if data and data.get("price"):
-                print(f"      {data['price']:.2f}EUR {data.get('departure_time', '')} {data.get('duration', '')}")
-                results.append(PriceResult(
-                    timestamp=datetime.now().isoformat(),
-                    route_id=route.id,
-                    transport_type="train",
-                    cabin_class=cabin.upper(),
-                    price=data["price"],
-                    currency="EUR",
-                    train_type=data.get("train_type", ""),
-                    departure_time=data.get("departure_time", ""),
-                    arrival_time=data.get("arrival_time", ""),
-                    duration=data.get("duration", ""),
-                    week_start=date_str,
-                    travel_date=date_str,
-                ))
-            else:
-                print(f"      Sin datos")
-                results.append(PriceResult(
-                    timestamp=datetime.now().isoformat(),
-                    route_id=route.id,
-                    transport_type="train",
-                    cabin_class=cabin.upper(),
-                    week_start=date_str,
-                    travel_date=date_str,
-                ))
-
-            time.sleep(2)
 
-    return results
+def scrape_train_routes(routes: list) -> dict:
+    """Scrape several train routes on one shared browser.
+
+    Returns {route.id: [PriceResult]}. Routes run concurrently in a single
+    event loop, so Chromium is launched at most once per check (and not at
+    all when every search is served from the cache).
+    """
+    return asyncio.run(_scrape_train_routes(routes))
+
+
+async def _scrape_train_routes(routes: list) -> dict:
+    # Each plan's shelve lookups run as one batch in a worker thread, off
+    # the event loop
+    plans = {}
+    for route in routes:
+        try:
+            plans[route.id] = await asyncio.to_thread(_plan_route, route)
+        except Exception as e:
+            log.error("  Error scraping trains %s: %s", route.id, e)
+
+    todo = [(route, plans[route.id]) for route in routes
+            if route.id in plans and plans[route.id][2]]
+    if todo:
+        try:
+            # Imported on first launch: the package is heavy, and checks
+            # served from the cache (or --dashboard runs) never need it
+            from playwright.async_api import async_playwright
+
+            async with async_playwright() as p:
+                browser = await p.chromium.launch(headless=True, args=_LAUNCH_ARGS)
+                session = {}  # storage state shared by the searches of this check
+                page_sem = asyncio.Semaphore(MAX_OPEN_PAGES)
+                try:
+                    outcomes = await asyncio.gather(
+                        *(_fetch_pending(route, *plan, browser, session, page_sem)
+                          for route, plan in todo),
+                        return_exceptions=True,
+                    )
+                finally:
+                    await browser.close()
+            for (route, _), outcome in zip(todo, outcomes):
+                if isinstance(outcome, BaseException):
+                    log.error("  Error scraping trains %s: %s", route.id, outcome)
+        except Exception as e:
+            log.exception("  Error scraping trains: %s", e)
+
+    # Routes left with unresolved units are dropped; cached ones still count
+    return {route_id: results for route_id, (_, results, pending) in plans.items()
+            if not any(results[i] is None for i in pending)}
+
+
+def _plan_route(route: TrainRoute):
+    """Week/class units of a route, their cached results and the indices still to fetch.
+
+    Blocking (one cache lookup per unit): run it in a worker thread.
+    """
+    log.info("  === Trenes %s: %s -> %s ===", route.id, route.origin_name, route.destination_name)
+
+    # Travel dates from next Monday, each formatted once
+    dates = [(monday, monday.isoformat()) for monday in week_mondays(route.weeks)]
+    units = [
+        (week_idx, travel_date, date_str, cabin)
+        for week_idx, (travel_date, date_str) in enumerate(dates)
+        for cabin in route.classes
+    ]
+
+    # Fresh cache hits need no browser at all
+    results = [_cached_result(route, week_idx, date_str, cabin)
+               for week_idx, _, date_str, cabin in units]
+    pending = [i for i, r in enumerate(results) if r is None]
+    return units, results, pending
+
+
+async def _fetch_pending(route: TrainRoute, units: list, results: list, pending: list,
+                         browser, session: dict, page_sem: asyncio.Semaphore) -> None:
+    """Fill results[i] for every pending unit with live searches."""
+    if not pending:
+        return
+
+    # Every class of a date is read off the same results page: one search
+    # per date, shared by its pending classes
+    by_date = {}
+    for i in pending:
+        _, travel_date, date_str, _ = units[i]
+        by_date.setdefault((travel_date, date_str), []).append(i)
+
+    # Date searches run concurrently, bounded per route; each search has
+    # its own context on the shared browser
+    sem = asyncio.Semaphore(TRAIN_CONCURRENCY)
+
+    async def run(travel_date, date_str, indices):
+        # A failed search only costs its own date: its classes are logged
+        # as without data and the other dates keep their results
+        try:
+            async with sem:
+                fare = await _scrape_providers(route, travel_date, date_str,
+                                               browser, session, page_sem)
+        except Exception as e:
+            log.warning("    %s: error (%s)", date_str, e)
+            fare = None
+
+        # Results keep unit order (week-major, class-minor) by index. Each
+        # date is cached as soon as it is searched; the shelve writes run
+        # in a worker thread so the other searches keep going meanwhile
+        def store():
+            for i in indices:
+                results[i] = _fare_result(route, date_str, units[i][3], fare)
+
+        await asyncio.to_thread(store)
+
+    await asyncio.gather(*(run(*key, indices) for key, indices in by_date.items()))
+
+
+def _cache_key(route: TrainRoute, date_str: str, cabin: str) -> str:
+    return f"train|{route.id}|{date_str}|{cabin}"
+
+
+def _cached_result(route: TrainRoute, week_idx: int, date_str: str,
+                   cabin: str) -> Optional[PriceResult]:
+    """Cached priced result for a date/class, or None if missing or stale."""
+    ttl = NEAR_TERM_CACHE_TTL if week_idx < NEAR_TERM_WEEKS else SCRAPE_CACHE_TTL
+    cached = cache_get(_cache_key(route, date_str, cabin), ttl)
+    if not cached:
+        return None
+    label = "Turista" if cabin == "turista" else "Preferente"
+    log.info("    [%s] %s (cache: %.2fEUR)", label, date_str, cached["price"])
+    return PriceResult(**{**cached, "cached": True})
+
+
+async def _scrape_providers(route: TrainRoute, travel_date: date, date_str: str,
+                            browser, session: dict,
+                            page_sem: asyncio.Semaphore) -> Optional[dict]:
+    """One date search, falling back through the providers. Cheapest fare or None.
+
+    A fallback starts, on its own tab of the date's context, when the
+    provider before it misses or has had PROVIDER_HEAD_START seconds without
+    answering; a normal Renfe hit opens a single tab. Results are taken in
+    priority order: once a provider has a fare, the ones after it are
+    cancelled, and a failing provider falls through to the next. Tabs wait
+    on page_sem, shared by the whole browser.
+
+    The first search to find a fare saves its storage state in session;
+    later contexts start from it, with cookie banners already dismissed.
+    """
+    log.info("    %s", date_str)
+
+    async with await _new_context(browser, session.get("storage_state")) as ctx:
+        tasks = []
+
+        def start(i):
+            """Start provider i, unless it is already running (or there is none)."""
+            if i == len(tasks) and i < len(_PROVIDERS):
+                tasks.append(asyncio.create_task(_on_new_page(
+                    ctx, page_sem, _PROVIDERS[i][1], route, travel_date,
+                    functools.partial(start, i + 1))))
+
+        start(0)
+        try:
+            for i, (name, _) in enumerate(_PROVIDERS):
+                try:
+                    data = await tasks[i]
+                except Exception as e:
+                    log.warning("        %s error: %s", name, e)
+                    data = None
+                if data and data.get("price"):
+                    if "storage_state" not in session:
+                        session["storage_state"] = await ctx.storage_state()
+                    return data
+                if i + 1 < len(_PROVIDERS):
+                    log.info("      %s: %s sin datos, %s...",
+                             date_str, name, _PROVIDERS[i + 1][0])
+                    start(i + 1)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    return None
+
+
+async def _on_new_page(ctx, page_sem: asyncio.Semaphore, scrape, route: TrainRoute,
+                       travel_date: date, on_slow=None) -> Optional[dict]:
+    """Run one provider on a fresh tab, closed once it is done.
+
+    on_slow is called if the provider is still running PROVIDER_HEAD_START
+    seconds after its tab opened.
+    """
+    async with page_sem:
+        page = await ctx.new_page()
+        timer = (asyncio.get_running_loop().call_later(PROVIDER_HEAD_START, on_slow)
+                 if on_slow else None)
+        try:
+            return await scrape(route, travel_date, page)
+        finally:
+            if timer:
+                timer.cancel()
+            await page.close()
+
+
+def _fare_for_cabin(fare: dict, cabin: str) -> dict:
+    """Turista is the cheapest fare found; other classes are estimated from it.
+
+    Preferente prices are not directly visible on results pages (would need
+    to click a train), so they are estimated at ~1.6x turista.
+    """
+    if cabin == "turista":
+        return fare
+    estimate = fare.copy()
+    estimate["price"] = round(fare["price"] * 1.6, 2)
+    return estimate
+
+
+def _fare_result(route: TrainRoute, date_str: str, cabin: str,
+                 fare: Optional[dict]) -> PriceResult:
+    """PriceResult for one class of a searched date; priced ones are cached."""
+    label = "Turista" if cabin == "turista" else "Preferente"
+    if fare:
+        data = _fare_for_cabin(fare, cabin)
+        log.info("      [%s] %s: %.2fEUR %s %s", label, date_str, data["price"],
+                 data.get("departure_time", ""), data.get("duration", ""))
+        result = PriceResult(
+            timestamp=datetime.now().isoformat(),
+            route_id=route.id,
+            transport_type="train",
+            cabin_class=cabin.upper(),
+            price=data["price"],
+            currency="EUR",
+            train_type=data.get("train_type", ""),
+            departure_time=data.get("departure_time", ""),
+            arrival_time=data.get("arrival_time", ""),
+            duration=data.get("duration", ""),
+            week_start=date_str,
+            travel_date=date_str,
+        )
+        cache_set(_cache_key(route, date_str, cabin), asdict(result))
+        return result
+    log.info("      [%s] %s: Sin datos", label, date_str)
+    return PriceResult(
+        timestamp=datetime.now().isoformat(),
+        route_id=route.id,
+        transport_type="train",
+        cabin_class=cabin.upper(),
+        week_start=date_str,
+        travel_date=date_str,
+    )
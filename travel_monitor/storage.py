@@ -1,12 +1,20 @@
 """CSV storage for flight and train price history."""
 
 import csv
+import hashlib
+import logging
 from pathlib import Path
 
 from .scrapers.base import PriceResult, CSV_HEADERS
 
 SCRIPT_DIR = Path(__file__).parent.parent
 DATA_DIR = SCRIPT_DIR / "data"
+FINGERPRINT_FILE = DATA_DIR / "last_check_hash"
+
+log = logging.getLogger(__name__)
+
+# transport_type -> ((mtime_ns, size), rows, rows_by_route); reused while the CSV is unchanged
+_HISTORY_CACHE = {}
 
 
 def _ensure_data_dir():
@@ -33,26 +41,83 @@ def log_results(results: list):
         new_file = not csv_path.exists()
 
         with open(csv_path, "a", newline="") as f:
-            w = csv.DictWriter(f, fieldnames=CSV_HEADERS)
+            w = csv.writer(f)
             if new_file:
-                w.writeheader()
-            for item in items:
-                w.writerow(item.to_csv_row())
+                w.writerow(CSV_HEADERS)
+            w.writerows(item.to_csv_tuple() for item in items)
 
 
-def read_history(transport_type: str, route_id: str = None) -> list:
-    """Read CSV history, optionally filtered by route_id."""
+def _load_history(transport_type: str):
+    """Parse a history CSV once into (rows, rows_by_route_id), cached by mtime/size."""
     csv_path = get_csv_path(transport_type)
-    if not csv_path.exists():
-        return []
+    try:
+        st = csv_path.stat()
+    except FileNotFoundError:
+        return [], {}
+
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _HISTORY_CACHE.get(transport_type)
+    if cached and cached[0] == stamp:
+        return cached[1], cached[2]
 
     rows = []
-    with open(csv_path) as f:
-        for r in csv.DictReader(f):
-            if route_id and r.get("route_id") != route_id:
+    by_route = {}
+    with open(csv_path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None) or []
+        # Plain csv.reader + zip: DictReader does the same per row in Python
+        for values in reader:
+            if not values:
                 continue
+            r = dict(zip(header, values))
+            r["price"] = float(r["price"]) if r.get("price") else None
             rows.append(r)
-    return rows
+            by_route.setdefault(r.get("route_id"), []).append(r)
+    _HISTORY_CACHE[transport_type] = (stamp, rows, by_route)
+    return rows, by_route
+
+
+def read_history(transport_type: str, route_id: str = None) -> list:
+    """Read CSV history, optionally filtered by route_id.
+
+    Row values are strings as in the CSV, except "price" (float, or None
+    when the check found no price).
+
+    Each CSV is parsed once and grouped by route, then served from memory
+    until the file's mtime or size changes (e.g. between daemon cycles with
+    no new results), so reading every route costs a single pass.
+    """
+    rows, by_route = _load_history(transport_type)
+    return list(by_route.get(route_id, ()) if route_id else rows)
+
+
+def _fingerprint_file(scope: str) -> Path:
+    """Hash file of a check scope: filtered runs never touch the full run's."""
+    return FINGERPRINT_FILE.with_name(f"{FINGERPRINT_FILE.name}_{scope}") if scope else FINGERPRINT_FILE
+
+
+def changed_fingerprint(results: list, scope: str = ""):
+    """Hash (route, week, cabin, price) of a check.
+
+    Returns the hash if it differs from the last one saved for scope, else
+    None. Nothing is stored: call save_fingerprint once the summary for it
+    is out, so a failed run is retried next time.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for r in results:
+        h.update(f"{r.route_id}|{r.week_start}|{r.cabin_class}|{r.price}\n".encode())
+    digest = h.hexdigest()
+
+    path = _fingerprint_file(scope)
+    if path.exists() and path.read_text().strip() == digest:
+        return None
+    return digest
+
+
+def save_fingerprint(digest: str, scope: str = ""):
+    """Record digest as the last handled check of scope."""
+    _ensure_data_dir()
+    _fingerprint_file(scope).write_text(digest)
 
 
 def migrate_old_csv():
@@ -65,7 +130,7 @@ def migrate_old_csv():
     if new_csv.exists():
         return  # Already migrated
 
-    print("  Migrating old prices.csv -> data/flights.csv ...")
+    log.info("  Migrating old prices.csv -> data/flights.csv ...")
     rows = []
     with open(old_csv) as f:
         for r in csv.DictReader(f):
@@ -92,4 +157,4 @@ def migrate_old_csv():
             w = csv.DictWriter(f, fieldnames=CSV_HEADERS)
             w.writeheader()
             w.writerows(rows)
-        print(f"  Migrated {len(rows)} records.")
+        log.info("  Migrated %d records.", len(rows))
@@ -1,13 +1,67 @@
-"""Protobuf encoding helpers and text normalization utilities."""
+"""Protobuf encoding helpers, JSON and text normalization utilities."""
 
 import base64
+import functools
+import json
 import unicodedata
+from datetime import date, timedelta
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+
+class _MarkTable(dict):
+    """str.translate table dropping combining marks, filled on first sight.
+
+    Each code point is classified once per process; after that translate()
+    resolves it with a plain dict hit in C.
+    """
+
+    def __missing__(self, cp):
+        value = None if unicodedata.category(chr(cp)).startswith('M') else cp
+        self[cp] = value
+        return value
+
+
+_STRIP_MARKS = _MarkTable()
 
 
 def normalize(text):
     """Remove accents and lowercase for comparison."""
-    nfkd = unicodedata.normalize('NFKD', text)
-    return ''.join(c for c in nfkd if not unicodedata.category(c).startswith('M')).lower()
+    return unicodedata.normalize('NFKD', text).translate(_STRIP_MARKS).lower()
+
+
+@functools.lru_cache(maxsize=256)
+def normalize_name(name):
+    """normalize() for short names and aliases, memoized.
+
+    Page texts go through the uncached normalize(): they are large and
+    rarely repeat, so caching them would only pin memory.
+    """
+    return normalize(name)
+
+
+def week_mondays(weeks: int, today: date = None) -> list:
+    """The next `weeks` Mondays, starting from next week's (never today)."""
+    today = today or date.today()
+    first = today + timedelta(days=7 - today.weekday())
+    return [first + timedelta(weeks=i) for i in range(weeks)]
+
+
+def json_loads(data):
+    """Parse JSON from str/bytes, with orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj):
+    """Serialize to a UTF-8 JSON str (non-ASCII kept as-is)."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, ensure_ascii=False)
 
 
 # ---------------------------------------------------------------------------
@@ -16,6 +70,8 @@ def normalize(text):
 
 def pb_varint(value):
     """Encode an integer as a protobuf varint."""
+    if value < 0x80:
+        return bytes((value,))  # tags, flags and short lengths: one byte
     result = bytearray()
     while value > 0x7f:
         result.append((value & 0x7f) | 0x80)
@@ -24,8 +80,9 @@ def pb_varint(value):
     return bytes(result)
 
 
+@functools.lru_cache(maxsize=None)
 def pb_tag(field, wire_type):
-    """Encode a protobuf field tag."""
+    """Encode a protobuf field tag (memoized: a message uses only a few)."""
     return pb_varint((field << 3) | wire_type)
 
 
@@ -41,8 +98,12 @@ def pb_field_string(field, s):
     return pb_field_bytes(field, s.encode("utf-8"))
 
 
+@functools.lru_cache(maxsize=256)
 def build_explore_tfs(origin_geo, dest_geo, dep_date, ret_date, cabin="economy"):
-    """Build the tfs protobuf parameter for Google Flights Explore URL."""
+    """Build the tfs protobuf parameter for Google Flights Explore URL.
+
+    Memoized (args are strings): every geo searches the same week/cabin.
+    """
     cabin_val = 1 if cabin == "economy" else 3
 
     origin_sub = pb_field_varint(1, 2) + pb_field_string(2, origin_geo)
@@ -51,29 +112,31 @@ def build_explore_tfs(origin_geo, dest_geo, dep_date, ret_date, cabin="economy")
     dest_sub = pb_field_string(2, dest_geo)
     filter_sub = bytes([0x08]) + bytes([0xff] * 9) + bytes([0x01])
 
-    tfs = (
-        pb_field_varint(1, 28)
-        + pb_field_varint(2, 3)
-        + pb_field_bytes(3, dep_leg)
-        + pb_field_bytes(3, ret_leg)
-        + pb_field_varint(8, 1)
-        + pb_field_varint(9, cabin_val)
-        + pb_field_varint(14, 1)
-        + pb_field_bytes(16, filter_sub)
-        + pb_field_varint(19, 1)
-        + pb_field_bytes(22, dest_sub)
-    )
+    tfs = b"".join((
+        pb_field_varint(1, 28),
+        pb_field_varint(2, 3),
+        pb_field_bytes(3, dep_leg),
+        pb_field_bytes(3, ret_leg),
+        pb_field_varint(8, 1),
+        pb_field_varint(9, cabin_val),
+        pb_field_varint(14, 1),
+        pb_field_bytes(16, filter_sub),
+        pb_field_varint(19, 1),
+        pb_field_bytes(22, dest_sub),
+    ))
     return base64.urlsafe_b64encode(tfs).rstrip(b"=").decode()
 
 
+@functools.lru_cache(maxsize=256)
 def build_explore_url(origin_geo, dest_geo, dep_date, ret_date, cabin="economy"):
-    """Build a complete Google Flights Explore URL with cabin class."""
+    """Build a complete Google Flights Explore URL with cabin class (memoized)."""
     tfs = build_explore_tfs(origin_geo, dest_geo, dep_date, ret_date, cabin)
     return f"https://www.google.com/travel/explore?tfs={tfs}&tfu=GgA&hl=es&curr=EUR"
 
 
+@functools.lru_cache(maxsize=256)
 def build_google_url(origin, destination, dep_date, ret_date, cabin="economy"):
-    """Build a direct Google Flights search URL."""
+    """Build a direct Google Flights search URL (memoized; args are strings)."""
     tt = "1" if cabin == "economy" else "3"
     return (
         f"https://www.google.com/travel/flights#flt="